@@ -0,0 +1,195 @@
+import argparse
+import os
+import random
+
+
+PROFILES = {
+    "mixed": {"paragraph": 4, "heading": 2, "ulist": 1, "olist": 1, "code": 1, "quote": 1},
+    "link-heavy": {"paragraph": 8, "heading": 1, "ulist": 2, "olist": 0, "code": 0, "quote": 1},
+    "list-heavy": {"paragraph": 2, "heading": 1, "ulist": 4, "olist": 4, "code": 0, "quote": 0},
+    "code-heavy": {"paragraph": 2, "heading": 1, "ulist": 0, "olist": 0, "code": 6, "quote": 0},
+}
+
+SIZES = {"small": 2_000, "large": 2_000_000}
+
+WORDS = (
+    "ring shire hobbit elf dwarf wizard mountain river forest road tale song "
+    "king queen sword shadow light journey fellowship council tower gate"
+).split()
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+def make_words(rng: random.Random, count: int) -> str:
+    """Return a run of plain words.
+
+    Args:
+        rng: The random generator to draw from
+        count: The number of words
+
+    Returns:
+        The words joined by spaces
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def make_inline(rng: random.Random, profile: str) -> str:
+    """Return a line of text with inline formatting suited to the profile.
+
+    Args:
+        rng: The random generator to draw from
+        profile: The corpus profile name
+
+    Returns:
+        A line of inline markdown
+    """
+    spans = []
+    link_weight = 6 if profile == "link-heavy" else 1
+    for _ in range(rng.randint(4, 10)):
+        kind = rng.choices(
+            ["text", "bold", "italic", "code", "link", "image"],
+            [4, 1, 1, 1, link_weight, link_weight // 3 + 1],
+        )[0]
+        words = make_words(rng, rng.randint(1, 4))
+        if kind == "bold":
+            spans.append(f"**{words}**")
+        elif kind == "italic":
+            spans.append(f"_{words}_")
+        elif kind == "code":
+            spans.append(f"`{words}`")
+        elif kind == "link":
+            spans.append(f"[{words}](/{rng.choice(WORDS)}/{rng.randint(0, 999)})")
+        elif kind == "image":
+            spans.append(f"![{words}](/images/{rng.choice(WORDS)}.png)")
+        else:
+            spans.append(words)
+    return " ".join(spans)
+
+
+def make_block(rng: random.Random, profile: str) -> str:
+    """Return one markdown block drawn from the profile's block mix.
+
+    Args:
+        rng: The random generator to draw from
+        profile: The corpus profile name
+
+    Returns:
+        A markdown block without surrounding blank lines
+    """
+    weights = PROFILES[profile]
+    kind = rng.choices(list(weights), list(weights.values()))[0]
+    if kind == "heading":
+        return f"{'#' * rng.randint(2, 4)} {make_words(rng, 4)}"
+    if kind == "ulist":
+        return "\n".join(f"- {make_inline(rng, profile)}" for _ in range(rng.randint(3, 12)))
+    if kind == "olist":
+        return "\n".join(
+            f"{i}. {make_inline(rng, profile)}" for i in range(1, rng.randint(3, 12) + 1)
+        )
+    if kind == "code":
+        lines = [f"    {make_words(rng, rng.randint(2, 8))}" for _ in range(rng.randint(3, 20))]
+        return "```\n" + "\n".join(lines) + "\n```"
+    if kind == "quote":
+        return "\n".join(f"> {make_inline(rng, profile)}" for _ in range(rng.randint(1, 4)))
+    return "\n".join(make_inline(rng, profile) for _ in range(rng.randint(1, 5)))
+
+
+def make_document(rng: random.Random, title: str, profile: str, size: str) -> str:
+    """Return a markdown document of roughly the requested size.
+
+    Args:
+        rng: The random generator to draw from
+        title: The text of the document's h1 header
+        profile: The corpus profile name
+        size: 'small' (a few KB) or 'large' (a few MB)
+
+    Returns:
+        The markdown document
+    """
+    blocks = [f"# {title}"]
+    length = 0
+    while length < SIZES[size]:
+        block = make_block(rng, profile)
+        blocks.append(block)
+        length += len(block) + 2
+    return "\n\n".join(blocks) + "\n"
+
+
+def page_paths(pages: int) -> list[str]:
+    """Return the content-relative paths of a corpus's pages.
+
+    Args:
+        pages: The number of pages
+
+    Returns:
+        A list of paths such as 'index.md' and 'section-3/page-13/index.md'
+    """
+    paths = ["index.md"]
+    for i in range(1, pages):
+        paths.append(os.path.join(f"section-{i % 10}", f"page-{i}", "index.md"))
+    return paths
+
+
+def write_corpus(
+    root: str, pages: int, profile: str = "mixed", size: str = "small", seed: int = 0
+) -> list[str]:
+    """Write a deterministic site (content, static and template) under a directory.
+
+    The same arguments always produce byte-identical files.
+
+    Args:
+        root: The directory to create the site in
+        pages: The number of markdown pages to generate
+        profile: The corpus profile name (default: 'mixed')
+        size: 'small' or 'large' documents (default: 'small')
+        seed: Seed for the random generator (default: 0)
+
+    Returns:
+        The paths of the generated markdown files
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown corpus profile: {profile}")
+    if size not in SIZES:
+        raise ValueError(f"Unknown document size: {size}")
+    os.makedirs(os.path.join(root, "static", "images"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body {\n  margin: 0 auto;\n  max-width: 40em;\n}\n")
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+
+    written = []
+    for i, rel_path in enumerate(page_paths(pages)):
+        rng = random.Random(f"{seed}-{profile}-{size}-{i}")
+        path = os.path.join(root, "content", rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(make_document(rng, f"Page {i}", profile, size))
+        written.append(path)
+    return written
+
+
+def main() -> None:
+    """Write a corpus to a directory from the command line."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic site corpus.")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    written = write_corpus(args.root, args.pages, args.profile, args.size, args.seed)
+    print(f"Wrote {len(written)} pages to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import timeit
+from src.inline_markdown import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from src.textnode import TextNode, TextType
+
+
+def multi_pass_text_to_textnodes(text: str) -> list[TextNode]:
+    """Reference implementation that tokenizes text with one pass per syntax.
+
+    Args:
+        text: A string containing markdown text with formatting
+
+    Returns:
+        A list of TextNode objects representing the formatted text
+    """
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    return split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+
+def make_paragraph(spans: int) -> str:
+    """Build a paragraph mixing links, images and emphasis spans.
+
+    Args:
+        spans: The number of formatted spans in the paragraph
+
+    Returns:
+        The markdown text of the paragraph
+    """
+    kinds = [
+        "see [link {i}](https://example.com/{i})",
+        "**bold {i}**",
+        "an _italic {i}_ word",
+        "`code {i}`",
+        "![image {i}](/images/{i}.png)",
+    ]
+    words = [kinds[i % len(kinds)].format(i=i) for i in range(spans)]
+    return " and ".join(words)
+
+
+def main() -> None:
+    """Time the single-pass tokenizer against the multi-pass reference."""
+    parser = argparse.ArgumentParser(description="Benchmark inline tokenizing.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'spans':>6} {'multi-pass ms':>14} {'single-pass ms':>15} {'speedup':>8}")
+    for spans in (10, 100, 1000, 5000):
+        text = make_paragraph(spans)
+        assert text_to_textnodes(text) == multi_pass_text_to_textnodes(text)
+        multi = min(
+            timeit.repeat(lambda: multi_pass_text_to_textnodes(text), number=1, repeat=args.repeat)
+        )
+        single = min(
+            timeit.repeat(lambda: text_to_textnodes(text), number=1, repeat=args.repeat)
+        )
+        print(f"{spans:>6} {multi * 1000:>14.2f} {single * 1000:>15.2f} {multi / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
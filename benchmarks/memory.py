@@ -0,0 +1,74 @@
+import argparse
+import sys
+import tracemalloc
+from benchmarks.inline import make_paragraph
+from src.htmlnode import LeafNode
+from src.inline_markdown import text_to_textnodes
+from src.textnode import TextNode, text_node_to_html_node
+
+
+class DictTextNode:
+    """TextNode layout without __slots__, kept as the memory baseline."""
+
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    """LeafNode layout without __slots__, kept as the memory baseline."""
+
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def bytes_per_node(factory, arguments: list[tuple]) -> float:
+    """Measure the average memory allocated for each node built by a factory.
+
+    Args:
+        factory: The node class to instantiate
+        arguments: The argument tuples to build the nodes from
+
+    Returns:
+        The number of bytes allocated per node
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(*args) for args in arguments]
+    allocated = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(nodes)
+    tracemalloc.stop()
+    return allocated / len(nodes)
+
+
+def main() -> None:
+    """Report bytes per node for dict-backed and slotted node layouts."""
+    parser = argparse.ArgumentParser(description="Benchmark node memory use.")
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args()
+
+    text_arguments = []
+    leaf_arguments = []
+    for i in range(args.paragraphs):
+        for node in text_to_textnodes(make_paragraph(20 + i % 10)):
+            text_arguments.append((node.text, node.text_type, node.url))
+            leaf = text_node_to_html_node(node)
+            leaf_arguments.append((leaf.tag, leaf.value, leaf.props))
+
+    print(f"{len(text_arguments)} text nodes from {args.paragraphs} paragraphs")
+    print(f"{'node':>10} {'dict bytes':>11} {'slotted bytes':>14}")
+    for name, before, after, arguments in (
+        ("TextNode", DictTextNode, TextNode, text_arguments),
+        ("LeafNode", DictLeafNode, LeafNode, leaf_arguments),
+    ):
+        print(
+            f"{name:>10} {bytes_per_node(before, arguments):>11.1f}"
+            f" {bytes_per_node(after, arguments):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
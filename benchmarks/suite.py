@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.corpus import PROFILES, SIZES, write_corpus
+from src.generate_content import generate_page
+from src.inline_markdown import text_to_textnodes
+from src.markdown_blocks import (
+    BlockType,
+    block_to_block_type,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+import src.main
+
+
+def time_stage(function, repeat: int) -> dict:
+    """Run a stage several times and summarize its wall-clock time.
+
+    Args:
+        function: A callable running the whole stage once
+        repeat: The number of runs
+
+    Returns:
+        A dictionary with the best and mean run time in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "mean_s": sum(times) / len(times), "runs": times}
+
+
+def git_revision() -> str:
+    """Return the current git commit, or None outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(root: str, repeat: int) -> dict:
+    """Time every stage of the generator against the corpus under a directory.
+
+    Args:
+        root: The directory holding the corpus's content, static and template
+        repeat: The number of runs per stage
+
+    Returns:
+        A dictionary mapping stage names to their timings
+    """
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, "content")):
+        for fname in sorted(filenames):
+            sources.append(os.path.join(dirpath, fname))
+    sources.sort()
+    documents = []
+    for path in sources:
+        with open(path) as f:
+            documents.append(f.read())
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    typed_blocks = [(block, block_to_block_type(block)) for block in blocks]
+    inline_texts = [
+        block.replace("\n", " ")
+        for block, block_type in typed_blocks
+        if block_type == BlockType.PARAGRAPH
+    ]
+    trees = [markdown_to_html_node(document) for document in documents]
+    template_path = os.path.join(root, "template.html")
+    out_dir = os.path.join(root, "out")
+
+    def generate_pages():
+        for i, path in enumerate(sources):
+            generate_page(path, template_path, os.path.join(out_dir, f"{i}.html"))
+
+    def build_site():
+        cwd = os.getcwd()
+        argv = sys.argv
+        os.chdir(root)
+        sys.argv = ["src.main"]
+        try:
+            src.main.main()
+        finally:
+            os.chdir(cwd)
+            sys.argv = argv
+
+    stages = {
+        "markdown_to_blocks": (lambda: [markdown_to_blocks(d) for d in documents], len(documents)),
+        "block_to_block_type": (lambda: [block_to_block_type(b) for b in blocks], len(blocks)),
+        "text_to_textnodes": (lambda: [text_to_textnodes(t) for t in inline_texts], len(inline_texts)),
+        "ParentNode.to_html": (lambda: [tree.to_html() for tree in trees], len(trees)),
+        "generate_page": (generate_pages, len(sources)),
+        "main": (build_site, len(sources)),
+    }
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, (function, items) in stages.items():
+            results[name] = time_stage(function, repeat)
+            results[name]["items"] = items
+    return results
+
+
+def main() -> None:
+    """Generate a corpus, time every stage and write the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark the site generator.")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_corpus(root, args.pages, args.profile, args.size, args.seed)
+        results = run_suite(root, args.repeat)
+
+    report = {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "pages": args.pages,
+            "profile": args.profile,
+            "size": args.size,
+            "seed": args.seed,
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }
+    for name, result in results.items():
+        print(f"{name:>20} {result['best_s'] * 1000:>10.2f} ms  ({result['items']} items)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
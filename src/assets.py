@@ -0,0 +1,152 @@
+import logging
+import os
+from src.copystatic import copy_file
+from src.manifest import (
+    hash_bytes,
+    hash_file,
+    load_json_state,
+    refresh_file_entries,
+    save_json_state,
+)
+from src.minify import MinifyCache, is_minifiable
+
+
+logger = logging.getLogger(__name__)
+
+# Number of hex digits of the content hash put in fingerprinted file names
+FINGERPRINT_LENGTH = 10
+
+
+def fingerprinted_path(rel_path: str, digest: str) -> str:
+    """Return the name an asset is published under, with its content hash before the extension.
+
+    Args:
+        rel_path: The asset's path relative to the static directory, e.g. 'images/tom.png'
+        digest: The hex digest of the asset's contents
+
+    Returns:
+        The fingerprinted relative path, e.g. 'images/tom.0123456789.png'
+    """
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def is_fingerprintable(rel_path: str) -> bool:
+    """Tell whether a static file gets a fingerprinted copy.
+
+    HTML files are left alone since their URLs are the ones visitors type and link to.
+
+    Args:
+        rel_path: The file's path relative to the static directory
+
+    Returns:
+        True if the file should be fingerprinted
+    """
+    return not rel_path.endswith(".html")
+
+
+class AssetManifest:
+    """Record of the content hash of every static asset, keyed by path, size and mtime."""
+
+    def __init__(self, assets: dict = None) -> None:
+        """Initialize a manifest with per-asset entries.
+
+        Args:
+            assets: A dictionary mapping relative asset paths to {size, mtime_ns, hash} entries
+        """
+        self.assets = assets if assets is not None else {}
+        self.hashed = 0
+
+    @classmethod
+    def load(cls, path: str) -> "AssetManifest":
+        """Load a manifest from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: The path to the manifest JSON file
+
+        Returns:
+            The loaded AssetManifest
+        """
+        return cls(load_json_state(path, "assets"))
+
+    def save(self, path: str) -> None:
+        """Write the manifest to disk.
+
+        Args:
+            path: The path to the manifest JSON file
+        """
+        save_json_state(path, {"assets": self.assets})
+
+    def fingerprint(self, source_path: str, minify: bool = False) -> dict[str, str]:
+        """Return the fingerprinted path of every asset, hashing only new or changed files.
+
+        A file whose size and modification time match its entry keeps the recorded
+        hash. Entries of deleted files are dropped.
+
+        Args:
+            source_path: The path to the static directory
+            minify: Whether minifiable assets are published minified, which gives
+                them a different fingerprint than their original contents
+
+        Returns:
+            A dictionary mapping relative asset paths to fingerprinted relative paths
+        """
+        self.assets, self.hashed = refresh_file_entries(
+            self.assets,
+            source_path,
+            is_fingerprintable,
+            lambda path: {"hash": hash_file(path)},
+        )
+        fingerprints = {}
+        for rel_path, entry in self.assets.items():
+            digest = entry["hash"]
+            if minify and is_minifiable(rel_path):
+                digest = hash_bytes(f"{digest}\0minify".encode())
+            fingerprints[rel_path] = fingerprinted_path(rel_path, digest)
+        logger.debug(f"Fingerprinted {len(fingerprints)} assets, {self.hashed} rehashed")
+        return fingerprints
+
+
+def asset_urls(fingerprints: dict[str, str]) -> dict[str, str]:
+    """Turn fingerprinted relative paths into the root-relative URL map used for rendering.
+
+    Args:
+        fingerprints: A dictionary returned by AssetManifest.fingerprint
+
+    Returns:
+        A dictionary mapping asset URLs, e.g. '/index.css', to fingerprinted URLs
+    """
+    return {f"/{rel_path}": f"/{hashed}" for rel_path, hashed in fingerprints.items()}
+
+
+def publish_fingerprinted(
+    source_path: str,
+    destination_path: str,
+    fingerprints: dict[str, str],
+    link: bool = False,
+    minify_cache: MinifyCache = None,
+) -> int:
+    """Copy every asset to its fingerprinted name next to the original copy.
+
+    A fingerprinted file that already exists has the same contents by construction
+    and is not copied again.
+
+    Args:
+        source_path: The path to the static directory
+        destination_path: The path to the destination directory
+        fingerprints: A dictionary returned by AssetManifest.fingerprint
+        link: Hardlink files instead of copying them when possible
+        minify_cache: Write stylesheets minified, reusing this cache's results
+
+    Returns:
+        The number of fingerprinted files written
+    """
+    written = 0
+    for rel_path, hashed in fingerprints.items():
+        new_path = os.path.join(destination_path, hashed)
+        if os.path.exists(new_path):
+            continue
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        copy_file(os.path.join(source_path, rel_path), new_path, link, minify_cache)
+        written += 1
+    return written
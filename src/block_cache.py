@@ -0,0 +1,136 @@
+import hashlib
+import json
+from collections import OrderedDict
+from src.markdown_blocks import BlockType, block_to_html_node
+from src.render_options import RenderOptions
+
+
+def block_key(block: str, options: RenderOptions = None) -> str:
+    """Return the cache key of a markdown block.
+
+    Args:
+        block: The markdown text of the block
+        options: The render settings the block is rendered with
+
+    Returns:
+        A hex digest of the block's contents and render settings
+    """
+    digest = hashlib.blake2b(block.encode(), digest_size=16)
+    if options is not None:
+        digest.update(b"\0" + options.cache_key().encode())
+    return digest.hexdigest()
+
+
+class BlockCache:
+    """Bounded LRU cache of rendered block HTML keyed by block content hash."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: The number of rendered blocks kept before evicting the least recently used
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Entries rendered since take_added was last called; None until it is first called
+        self.added = None
+
+    @classmethod
+    def load(cls, path: str, maxsize: int = 4096) -> "BlockCache":
+        """Load a cache persisted by a previous build, or start an empty one.
+
+        Args:
+            path: The path to the cache JSON file
+            maxsize: The number of rendered blocks to keep
+
+        Returns:
+            The loaded BlockCache
+        """
+        cache = cls(maxsize)
+        try:
+            with open(path, "r") as f:
+                entries = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return cache
+        for key, html in entries[-maxsize:]:
+            cache.entries[key] = html
+        return cache
+
+    def save(self, path: str) -> None:
+        """Persist the cache, least recently used entries first.
+
+        Args:
+            path: The path to the cache JSON file
+        """
+        with open(path, "w") as f:
+            json.dump({"entries": list(self.entries.items())}, f)
+
+    def render(
+        self, block: str, block_type: BlockType = None, options: RenderOptions = None
+    ) -> str:
+        """Return the HTML of a block, rendering it only if it is not cached.
+
+        Args:
+            block: The markdown text of the block
+            block_type: The block's type, if already known
+            options: The render settings to render the block with
+
+        Returns:
+            The block's HTML fragment
+        """
+        key = block_key(block, options)
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+        self.misses += 1
+        html = block_to_html_node(block, block_type, options).to_html()
+        self._add(key, html)
+        if self.added is not None:
+            self.added[key] = html
+        return html
+
+    def _add(self, key: str, html: str) -> None:
+        """Store a rendered block as the most recently used, evicting past maxsize."""
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def take_added(self) -> dict:
+        """Return the entries rendered since the previous call, then start recording again.
+
+        Worker processes render into their own copy of the cache; the entries they
+        take here are sent back and merged into the parent's cache.
+
+        Returns:
+            A dictionary mapping cache keys to rendered HTML, empty on the first call
+        """
+        added = self.added or {}
+        self.added = {}
+        return added
+
+    def merge(self, entries: dict) -> None:
+        """Add entries rendered by another copy of the cache, e.g. in a worker process.
+
+        Args:
+            entries: A dictionary mapping cache keys to rendered HTML
+        """
+        for key, html in entries.items():
+            self._add(key, html)
+
+    def stats(self) -> dict:
+        """Return the cache's hit and miss counts.
+
+        Returns:
+            A dictionary with hits, misses, size and maxsize
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,143 @@
+import gzip
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.manifest import hash_bytes, load_json_state, save_json_state
+
+
+logger = logging.getLogger(__name__)
+
+# Text outputs worth precompressing; images are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".xml")
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    """Compress data at the maximum level into a reproducible gzip stream.
+
+    Args:
+        data: The bytes to compress
+
+    Returns:
+        The gzip stream, with a zero timestamp so identical inputs give identical outputs
+    """
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class CompressionManifest:
+    """Record of the content hash every precompressed output was made from."""
+
+    def __init__(self, files: dict = None) -> None:
+        """Initialize a manifest with per-file entries.
+
+        Args:
+            files: A dictionary mapping output paths, relative to the output directory, to hashes
+        """
+        self.files = files if files is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "CompressionManifest":
+        """Load a manifest from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: The path to the manifest JSON file
+
+        Returns:
+            The loaded CompressionManifest
+        """
+        return cls(load_json_state(path, "files"))
+
+    def save(self, path: str) -> None:
+        """Write the manifest to disk.
+
+        Args:
+            path: The path to the manifest JSON file
+        """
+        save_json_state(path, {"files": self.files})
+
+
+def compress_file(path: str, recorded_hash: str = None, min_size: int = 1024):
+    """Write the .gz variant of a file unless it is unchanged, too small or incompressible.
+
+    Args:
+        path: The path of the file to compress
+        recorded_hash: The hash the existing .gz variant was made from, if any
+        min_size: Files smaller than this many bytes are not compressed
+
+    Returns:
+        The file's hash if a .gz variant was written, False if the existing variant
+        is current, or None if the file gets no variant
+    """
+    gz_path = path + ".gz"
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) >= min_size:
+        digest = hash_bytes(data)
+        if digest == recorded_hash and os.path.exists(gz_path):
+            return False
+        compressed = gzip_bytes(data)
+        if len(compressed) < len(data):
+            with open(gz_path, "wb") as f:
+                f.write(compressed)
+            logger.debug(f"Compressed {path} ({len(data)} -> {len(compressed)} bytes)")
+            return digest
+    if os.path.exists(gz_path):
+        os.remove(gz_path)
+    return None
+
+
+def compress_tree(
+    root: str,
+    manifest: CompressionManifest,
+    min_size: int = 1024,
+    workers: int = None,
+) -> tuple[int, int]:
+    """Write .gz variants of every compressible file under a directory in parallel.
+
+    Files whose contents match the hash recorded in the manifest keep their
+    existing variant. Variants whose original file is gone are removed.
+
+    Args:
+        root: The path to the output directory
+        manifest: The record of hashes that existing variants were made from; updated in place
+        min_size: Files smaller than this many bytes are not compressed (default: 1024)
+        workers: Number of compressing threads; None picks one from the CPU count
+
+    Returns:
+        A tuple with the number of files compressed and the number left unchanged
+    """
+    candidates = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for fname in filenames:
+            path = os.path.join(dirpath, fname)
+            if fname.endswith(".gz"):
+                if not os.path.exists(path[:-3]):
+                    os.remove(path)
+                    logger.debug(f"Removed {path}")
+                continue
+            if fname.endswith(COMPRESSIBLE_EXTENSIONS):
+                rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+                candidates.append((rel_path, path))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda candidate: compress_file(
+                    candidate[1], manifest.files.get(candidate[0]), min_size
+                ),
+                candidates,
+            )
+        )
+
+    compressed = unchanged = 0
+    files = {}
+    for (rel_path, path), result in zip(candidates, results):
+        if result is None:
+            continue
+        if result is False:
+            files[rel_path] = manifest.files[rel_path]
+            unchanged += 1
+        else:
+            files[rel_path] = result
+            compressed += 1
+    manifest.files = files
+    return compressed, unchanged
@@ -1,53 +1,206 @@
+import errno
+import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from src.manifest import hash_file
+from src.minify import MinifyCache, is_minifiable, minify_file
 
 
-def move_tree(source_path: str, destination_path: str) -> None:
+logger = logging.getLogger(__name__)
+
+# Errors meaning the kernel cannot copy between these two files, e.g. across filesystems
+UNSUPPORTED_COPY_ERRORS = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+
+def move_tree(
+    source_path: str, destination_path: str, link: bool = False, workers: int = None
+) -> int:
     """Function that moves directories and files from a source path into a destination path.
     
     Args:
         source_path: The path to the source directory
         destination_path: The path to the destination directory
+        link: Hardlink files instead of copying them when both trees share a filesystem
+        workers: Number of copying threads; None picks one from the CPU count
+        
+    Returns:
+        The number of files copied
     """
-    print("Deleting public directory...")
+    clear_tree(destination_path)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Source directory structure:")
+        print_tree(source_path)
+    copied = recursive_copy(source_path, destination_path, link, workers)
+    logger.debug(f"Copied {copied} files from {source_path} to {destination_path}")
+    return copied
+
+
+def clear_tree(destination_path: str) -> None:
+    """Function that deletes a destination directory and everything in it, if it exists.
+    
+    Args:
+        destination_path: The path to the destination directory
+    """
+    logger.debug(f"Deleting {destination_path}")
     if os.path.exists(destination_path):
         shutil.rmtree(destination_path)
-    print("Copying static files to public directory...")
-    print("Source directory structure: ")
-    print_tree(source_path)
-    print()
-    recursive_copy(source_path, destination_path)
-    print(
-        f"{source_path} and all contained directories have been copied to {destination_path}"
-    )
-    print()
-
-
-def recursive_copy(source_path: str, destination_path: str) -> None:
+
+
+def recursive_copy(
+    source_path: str,
+    destination_path: str,
+    link: bool = False,
+    workers: int = None,
+    exclude: set = None,
+    minify_cache: MinifyCache = None,
+) -> int:
     """Function that recursively copies a directory tree into a destination directory.
     
+    The tree is scanned first, creating the destination directories, then the files
+    are copied by a pool of threads, since most static assets are small and the copy
+    time is dominated by per-file system calls rather than bytes.
+    
+    Args:
+        source_path: The path to the source directory
+        destination_path: The path to the destination directory
+        link: Hardlink files instead of copying them when both trees share a filesystem
+        workers: Number of copying threads; None picks one from the CPU count
+        exclude: Destination-relative paths of files that must not be copied
+        minify_cache: Minify stylesheets while copying them, reusing this cache's results
+        
+    Returns:
+        The number of files copied
+    """
+    files = scan_tree(source_path, destination_path)
+    if exclude:
+        files = [
+            (current_path, new_path)
+            for current_path, new_path in files
+            if os.path.relpath(new_path, destination_path) not in exclude
+        ]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(copy_file, current_path, new_path, link, minify_cache)
+            for current_path, new_path in files
+        ]
+        for future in futures:
+            future.result()
+    return len(files)
+
+
+def scan_tree(source_path: str, destination_path: str) -> list[tuple[str, str]]:
+    """Function that creates the destination directories of a tree and lists its files.
+    
     Args:
         source_path: The path to the source directory
         destination_path: The path to the destination directory
+        
+    Returns:
+        A list of (source file, destination file) pairs
     """
     if not os.path.exists(destination_path):
-        os.mkdir(destination_path)
-    print(f"Created new directory {destination_path}")
-    print()
-    dir_contents = os.listdir(source_path)
-    for path in dir_contents:
-        current_path = os.path.join(source_path, path)
-        new_path = os.path.join(destination_path, path)
-        if os.path.isfile(current_path):
-            shutil.copy(current_path, new_path)
-            print(f"Copied {current_path} -> {new_path}")
-            print()
+        os.makedirs(destination_path, exist_ok=True)
+        logger.debug(f"Created new directory {destination_path}")
+    files = []
+    with os.scandir(source_path) as entries:
+        for entry in entries:
+            new_path = os.path.join(destination_path, entry.name)
+            if entry.is_dir():
+                files.extend(scan_tree(entry.path, new_path))
+            else:
+                files.append((entry.path, new_path))
+    return files
+
+
+def copy_file(
+    source_file: str,
+    destination_file: str,
+    link: bool = False,
+    minify_cache: MinifyCache = None,
+) -> bool:
+    """Function that copies a file's contents, letting the kernel move the bytes
+    when it can.
+    
+    An existing destination is unlinked first, so a destination that is a hardlink
+    to its source is replaced rather than truncated.
+    
+    Args:
+        source_file: The path to the source file
+        destination_file: The path to the new file
+        link: Hardlink the file instead, falling back to a copy across filesystems
+        minify_cache: Write stylesheets minified, reusing this cache's results
+        
+    Returns:
+        True if the file was hardlinked rather than copied
+    """
+    if minify_cache is not None and is_minifiable(source_file):
+        minify_file(source_file, destination_file, minify_cache)
+        return False
+    try:
+        os.unlink(destination_file)
+    except FileNotFoundError:
+        pass
+    if link:
+        try:
+            os.link(source_file, destination_file)
+            logger.debug(f"Linked {source_file} -> {destination_file}")
+            return True
+        except OSError:
+            pass
+    with open(source_file, "rb") as fsrc, open(destination_file, "wb") as fdst:
+        if not kernel_copy(fsrc.fileno(), fdst.fileno()):
+            shutil.copyfileobj(fsrc, fdst)
+    logger.debug(f"Copied {source_file} -> {destination_file}")
+    return False
+
+
+def kernel_copy(source_fd: int, destination_fd: int) -> bool:
+    """Function that copies a whole file between descriptors without reading it into
+    Python, using copy_file_range or sendfile where the platform supports them.
+    
+    Args:
+        source_fd: A file descriptor open for reading at offset 0
+        destination_fd: A file descriptor open for writing at offset 0
+        
+    Returns:
+        True if the file was copied, False if neither call is supported and nothing was written
+    """
+    size = os.fstat(source_fd).st_size
+    for name in ("copy_file_range", "sendfile"):
+        call = getattr(os, name, None)
+        if call is None:
             continue
-        recursive_copy(current_path, new_path)
+        copied = 0
+        try:
+            while copied < size:
+                if name == "sendfile":
+                    sent = call(destination_fd, source_fd, copied, size - copied)
+                else:
+                    sent = call(source_fd, destination_fd, size - copied)
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError as e:
+            if copied or e.errno not in UNSUPPORTED_COPY_ERRORS:
+                raise
+            continue
+        if copied == size:
+            return True
+        raise OSError(f"short copy: {copied} of {size} bytes")
+    return False
 
 
 def print_tree(root_dir: str) -> None:
-    """Function that prints a directory's tree structure.
+    """Function that logs a directory's tree structure at debug level.
     
     Args:
         root_dir: The root directory path to print the tree structure for
@@ -55,7 +208,108 @@ def print_tree(root_dir: str) -> None:
     for dirpath, dirnames, filenames in os.walk(root_dir):
         depth = dirpath[len(root_dir) :].count(os.sep)
         indent = "    " * depth
-        print(f"{indent}{os.path.basename(dirpath)}/")
+        logger.debug(f"{indent}{os.path.basename(dirpath)}/")
         subindent = "    " * (depth + 1)
         for fname in filenames:
-            print(f"{subindent}{fname}")
+            logger.debug(f"{subindent}{fname}")
+
+
+def is_generated_file(path: str) -> bool:
+    """Function that tells whether a destination file is a generated page or a
+    precompressed variant rather than a copied static asset.
+    
+    Args:
+        path: The path of the file relative to the destination directory
+        
+    Returns:
+        True if the file is a generated HTML page or a .gz variant
+    """
+    return path.endswith((".html", ".gz"))
+
+
+def sync_tree(
+    source_path: str,
+    destination_path: str,
+    checksum: bool = False,
+    keep=is_generated_file,
+    link: bool = False,
+    minify_cache: MinifyCache = None,
+) -> tuple[int, int]:
+    """Function that brings a destination directory up to date with a source directory,
+    copying only new or changed files and removing files whose source was deleted.
+    
+    Files are compared by size and modification time. Copies keep the source's
+    modification time so that unchanged files compare equal on the next sync.
+    
+    Args:
+        source_path: The path to the source directory
+        destination_path: The path to the destination directory
+        checksum: Compare contents of files whose size matches but whose mtime differs
+        keep: Predicate on destination-relative paths of files that must never be removed
+        link: Hardlink new or changed files instead of copying them when possible
+        minify_cache: Minify stylesheets, rewriting them only when the minified
+            contents change, reusing this cache's results
+        
+    Returns:
+        A tuple with the number of files copied and the number of files removed
+    """
+    copied = 0
+    source_files = set()
+    for dirpath, dirnames, filenames in os.walk(source_path):
+        rel_dir = os.path.relpath(dirpath, source_path)
+        os.makedirs(os.path.join(destination_path, rel_dir), exist_ok=True)
+        for fname in filenames:
+            rel_path = os.path.normpath(os.path.join(rel_dir, fname))
+            source_files.add(rel_path)
+            current_path = os.path.join(source_path, rel_path)
+            new_path = os.path.join(destination_path, rel_path)
+            if minify_cache is not None and is_minifiable(rel_path):
+                # Minified copies never match their source's size, so compare contents
+                copied += minify_file(current_path, new_path, minify_cache)
+                continue
+            if is_up_to_date(current_path, new_path, checksum):
+                continue
+            if not copy_file(current_path, new_path, link):
+                shutil.copystat(current_path, new_path)
+            copied += 1
+
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(destination_path, topdown=False):
+        rel_dir = os.path.relpath(dirpath, destination_path)
+        for fname in filenames:
+            rel_path = os.path.normpath(os.path.join(rel_dir, fname))
+            if rel_path in source_files or keep(rel_path):
+                continue
+            os.remove(os.path.join(dirpath, fname))
+            removed += 1
+            logger.debug(f"Removed {os.path.join(dirpath, fname)}")
+        if rel_dir != "." and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    logger.debug(f"Synced {source_path} to {destination_path}: {copied} copied, {removed} removed")
+    return copied, removed
+
+
+def is_up_to_date(source_file: str, destination_file: str, checksum: bool = False) -> bool:
+    """Function that checks whether a copied file still matches its source.
+    
+    Args:
+        source_file: The path to the source file
+        destination_file: The path to the copied file
+        checksum: Compare contents when the sizes match but the mtimes differ
+        
+    Returns:
+        True if the copy does not need to be refreshed
+    """
+    try:
+        destination_stat = os.stat(destination_file)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_file)
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+        return True
+    if not checksum or hash_file(source_file) != hash_file(destination_file):
+        return False
+    shutil.copystat(source_file, destination_file)
+    return True
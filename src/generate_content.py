@@ -1,13 +1,30 @@
 from src.markdown_blocks import (
-    markdown_to_blocks,
-    block_to_block_type,
-    BlockType,
-    markdown_to_html_node,
+    BlockStream,
+    Document,
+    parse_document,
+    document_to_html_node,
+    scan_title,
 )
+from src.manifest import BuildManifest, hash_bytes, hash_file
+from src.block_cache import BlockCache
+from src.render_options import RenderOptions
+from src.template import Template
+from src.profiling import enable_profiling, get_profiler, profile_stage
+from src.pipeline import run_pipeline, worker_context
+from src.search_index import block_terms, enable_indexing, get_indexer, index_document
+from src.shards import select_shard
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import logging
 import os
+import time
 from pathlib import Path
 
 
+logger = logging.getLogger(__name__)
+
+
 def extract_title(markdown_file: str) -> str:
     """Function that extracts the 'h1' header from markdown text.
     
@@ -20,11 +37,24 @@ def extract_title(markdown_file: str) -> str:
     Raises:
         ValueError: If no h1 header is found in the markdown
     """
-    md_blocks = markdown_to_blocks(markdown_file)
-    for block in md_blocks:
-        if block_to_block_type(block) == BlockType.HEADING and block.startswith("# "):
-            return block.lstrip("# ").strip()
-    raise ValueError("No h1 header, invalid markdown file")
+    return document_title(parse_document(markdown_file))
+
+
+def document_title(document: Document) -> str:
+    """Function that returns the 'h1' header of an already parsed document.
+    
+    Args:
+        document: A parsed markdown Document
+        
+    Returns:
+        The text of the h1 header without the '#' prefix
+        
+    Raises:
+        ValueError: If no h1 header is found in the document
+    """
+    if document.title is None:
+        raise ValueError("No h1 header, invalid markdown file")
+    return document.title
 
 
 def generate_page(
@@ -39,27 +69,324 @@ def generate_page(
         dest_path: Path where the output HTML file will be created
         basepath: Base path for URLs in the HTML (default: "/")
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    logger.debug(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    render_page(
+        from_path,
+        Template.from_file(template_path, basepath),
+        dest_path,
+        options=RenderOptions(basepath),
+    )
+
+
+def render_page(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    cache: BlockCache = None,
+    options: RenderOptions = None,
+    stream_min_size: int = None,
+) -> None:
+    """Function that creates an HTML file at the destination path from a markdown
+    file and an already compiled template.
+    
+    Args:
+        from_path: Path to the source markdown file
+        template: The compiled page template
+        dest_path: Path where the output HTML file will be created
+        cache: Optional cache of rendered blocks shared between pages
+        options: Render settings such as the basepath links and images are rebased onto
+        stream_min_size: Sources of at least this many bytes are streamed with stream_page
+    """
+    if stream_min_size is not None and os.path.getsize(from_path) >= stream_min_size:
+        stream_page(from_path, template, dest_path, cache, options)
+        return
+    start = time.perf_counter()
+    with profile_stage("read"):
+        with open(from_path, "r") as md:
+            md_contents = md.read()
+
+    profiler = get_profiler()
+    if profiler is None:
+        document = parse_document(md_contents)
+        title = document_title(document)
+        index_document(from_path, title, document)
+        node = document_to_html_node(document, cache, options)
+        with replacing_file(dest_path) as html:
+            template.write(html, title, node)
+        return
+
+    write_html_file(dest_path, render_html(md_contents, template, cache, options, from_path))
+    profiler.add_page(from_path, time.perf_counter() - start)
+
+
+def stream_page(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    cache: BlockCache = None,
+    options: RenderOptions = None,
+) -> None:
+    """Function that renders a markdown file block by block straight into its HTML file,
+    so memory use is bounded by the largest block rather than the whole document.
+    
+    The source is read twice: once up to its h1 header for the title, which the
+    template may need before the content, then again while rendering. The page is
+    written to a temporary file that replaces the destination once it is complete.
+    
+    Args:
+        from_path: Path to the source markdown file
+        template: The compiled page template
+        dest_path: Path where the output HTML file will be created
+        cache: Optional cache of rendered blocks shared between pages
+        options: Render settings such as the basepath links and images are rebased onto
+        
+    Raises:
+        ValueError: If no h1 header is found in the markdown
+    """
+    start = time.perf_counter()
     with open(from_path, "r") as md:
-        md_contents = md.read()
+        title = scan_title(md)
+    if title is None:
+        raise ValueError("No h1 header, invalid markdown file")
+    indexer = get_indexer()
+    terms = Counter()
+    on_block = None
+    if indexer is not None:
+        on_block = lambda block, block_type, lines: terms.update(
+            block_terms(block, block_type, lines)
+        )
+    with open(from_path, "r") as md, replacing_file(dest_path) as html:
+        template.write(html, title, BlockStream(md, cache, options, on_block))
+    if indexer is not None:
+        indexer.add_terms(from_path, title, terms)
+    profiler = get_profiler()
+    if profiler is not None:
+        profiler.add_page(from_path, time.perf_counter() - start)
+
+
+@contextmanager
+def replacing_file(dest_path: str):
+    """Context manager that opens a temporary file next to the destination and moves it
+    over the destination once the block completes, so a page that fails to render never
+    leaves a truncated file behind, and a hardlinked copy of the old file is never
+    written through.
+    
+    Args:
+        dest_path: Path where the output HTML file will be created
+        
+    Yields:
+        The temporary file, open for writing text
+    """
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, "w") as html:
+            yield html
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_html(
+    md_contents: str,
+    template: Template,
+    cache: BlockCache = None,
+    options: RenderOptions = None,
+    from_path: str = None,
+) -> str:
+    """Function that renders markdown text into a full HTML page.
+    
+    Args:
+        md_contents: The markdown text of the page
+        template: The compiled page template
+        cache: Optional cache of rendered blocks shared between pages
+        options: Render settings such as the basepath links and images are rebased onto
+        from_path: Path to the source markdown file, used to record the page in the search index
+        
+    Returns:
+        The page's HTML
+    """
+    document = parse_document(md_contents)
+    title = document_title(document)
+    if from_path is not None:
+        index_document(from_path, title, document)
+    node = document_to_html_node(document, cache, options)
+    with profile_stage("render"):
+        html = node.to_html()
+    with profile_stage("template"):
+        return template.render(title, html)
+
+
+_worker_cache = None
+
+
+def init_worker(cache: BlockCache) -> None:
+    """Function that sets up a worker process with its own copy of the block cache.
+    
+    Args:
+        cache: The block cache to start from, or None
+    """
+    global _worker_cache
+    _worker_cache = cache
+    if cache is not None:
+        cache.take_added()
+
+
+def render_page_in_worker(
+    from_path: str,
+    template: Template,
+    dest_path: str,
+    options: RenderOptions = None,
+    profile: bool = False,
+    stream_min_size: int = None,
+    index: bool = False,
+) -> tuple[dict, int, int, dict, dict]:
+    """Function that renders a page in a worker process and returns what the parent
+    needs to merge: the page's profile, the worker cache's hit and miss counts and
+    new entries, and the page's search terms.
+    
+    Args:
+        from_path: Path to the source markdown file
+        template: The compiled page template
+        dest_path: Path where the output HTML file will be created
+        options: Render settings such as the basepath
+        profile: Whether to time the page's stages
+        stream_min_size: Sources of at least this many bytes are streamed with stream_page
+        index: Whether to collect the page's search terms
+        
+    Returns:
+        A tuple of the profile snapshot (or None), cache hits, cache misses, the
+        blocks the page added to the cache (or None) and the search index snapshot
+        (or None) for this page
+    """
+    profiler = enable_profiling() if profile else None
+    indexer = enable_indexing() if index else None
+    hits = misses = 0
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits, _worker_cache.misses
+    render_page(from_path, template, dest_path, _worker_cache, options, stream_min_size)
+    added = None
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+        added = _worker_cache.take_added()
+    return (
+        (profiler.snapshot() if profiler else None),
+        hits,
+        misses,
+        added,
+        (indexer.snapshot() if indexer else None),
+    )
 
-    with open(template_path, "r") as template:
-        html_content = template.read()
 
-    node = markdown_to_html_node(md_contents)
-    html = node.to_html()
-    title = extract_title(md_contents)
-    html_content = html_content.replace("{{ Title }}", title)
-    html_content = html_content.replace("{{ Content }}", html)
-    html_content = html_content.replace('href="/', f'href="{basepath}')
-    html_content = html_content.replace('src="/', f'src="{basepath}')
+def render_html_in_worker(
+    job: tuple[str, str, Template, RenderOptions, bool, bool],
+) -> tuple[str, dict, int, int, dict, dict]:
+    """Function that renders markdown text already read by the pipeline's reader
+    stage in a worker process, leaving the write to the pipeline's writer stage.
+    
+    Args:
+        job: A tuple of the source path, markdown text, compiled template, render
+            settings, whether to time the page's stages and whether to collect its
+            search terms
+        
+    Returns:
+        A tuple of the page's HTML, the profile snapshot (or None), cache hits, cache
+        misses, the blocks the page added to the cache (or None) and the search index
+        snapshot (or None)
+    """
+    from_path, md_contents, template, options, profile, index = job
+    profiler = enable_profiling() if profile else None
+    indexer = enable_indexing() if index else None
+    start = time.perf_counter()
+    hits = misses = 0
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits, _worker_cache.misses
+    html = render_html(md_contents, template, _worker_cache, options, from_path)
+    added = None
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+        added = _worker_cache.take_added()
+    if profiler is not None:
+        profiler.add_page(from_path, time.perf_counter() - start)
+    return (
+        html,
+        (profiler.snapshot() if profiler else None),
+        hits,
+        misses,
+        added,
+        (indexer.snapshot() if indexer else None),
+    )
+
+
+class BuildError(Exception):
+    """Raised when one or more pages fail to build."""
+
+    def __init__(self, failures: list[tuple[str, Exception]]) -> None:
+        """Initialize the error with every page that failed.
+
+        Args:
+            failures: A list of (source path, exception) pairs
+        """
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        for source_path, error in failures:
+            lines.append(f"  {source_path}: {error!r}")
+        super().__init__("\n".join(lines))
+
+
+def find_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, Path]]:
+    """Function that crawls through the source directory and pairs every markdown
+    file with the path of the html file generated from it.
+    
+    Args:
+        dir_path_content: Path to the source directory containing markdown files
+        dest_dir_path: Path to the destination directory for generated HTML files
+        
+    Returns:
+        A list of (source path, destination path) pairs sorted by source path
+    """
+    pages = []
+    for path in sorted(os.listdir(dir_path_content)):
+        current_path = os.path.join(dir_path_content, path)
+        dest_path = os.path.join(dest_dir_path, path)
+        if os.path.isfile(current_path):
+            pages.append((current_path, Path(dest_path).with_suffix(".html")))
+            continue
+        pages.extend(find_pages(current_path, dest_path))
+    return pages
 
-    write_html_file(dest_path, html_content)
+
+def page_destination(source_path: str, dir_path_content: str, dest_dir_path: str) -> Path:
+    """Function that returns the path of the html file generated from a markdown file.
+    
+    Args:
+        source_path: Path to the source markdown file
+        dir_path_content: Path to the source directory containing markdown files
+        dest_dir_path: Path to the destination directory for generated HTML files
+        
+    Returns:
+        The destination path of the generated page
+    """
+    rel_path = os.path.relpath(source_path, dir_path_content)
+    return Path(os.path.join(dest_dir_path, rel_path)).with_suffix(".html")
 
 
 def generate_pages_recursive(
-    dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str = "/"
-) -> None:
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    basepath: str = "/",
+    manifest: BuildManifest = None,
+    *,
+    jobs: int = 1,
+    cache: BlockCache = None,
+    pipeline: bool = False,
+    options: RenderOptions = None,
+    stream_min_size: int = None,
+    shard: tuple[int, int] = None,
+) -> int:
     """Function that crawls through the source directory, generates and writes html
     files into the destination path for every markdown file.
     
@@ -68,26 +395,257 @@ def generate_pages_recursive(
         template_path: Path to the HTML template file
         dest_dir_path: Path to the destination directory for generated HTML files
         basepath: Base path for URLs in the HTML (default: "/")
+        manifest: Optional build manifest; pages whose inputs are unchanged are skipped,
+            and pages whose sources were deleted are forgotten once every page was checked
+        jobs: Number of worker processes; None uses every CPU (default: 1)
+        cache: Optional cache of rendered blocks; each worker process renders into its own
+            copy, and the blocks the workers add are merged back into it
+        pipeline: Whether to overlap reading, rendering and writing pages in separate stages
+        options: Render settings such as fingerprinted asset URLs, minifying and image
+            attributes (default: RenderOptions(basepath))
+        stream_min_size: Sources of at least this many bytes are rendered block by block
+            straight to their HTML file; ignored in pipelined mode, which reads whole sources
+        shard: Optional (index, count) pair; only the pages of that shard are generated
+        
+    Returns:
+        The number of pages generated
+        
+    Raises:
+        BuildError: If any page fails to build in parallel or pipelined mode
+    """
+    pages = find_pages(dir_path_content, dest_dir_path)
+    if shard is not None:
+        pages = select_shard(pages, dir_path_content, shard)
+    source_hashes = {}
+    removed = 0
+    if manifest is not None:
+        stale_pages = []
+        for source_path, dest_path in pages:
+            with profile_stage("hash"):
+                source_hash = hash_file(source_path)
+            if manifest.is_current(source_path, source_hash, dest_path):
+                logger.debug(f"Skipping unchanged page {source_path}")
+                continue
+            source_hashes[source_path] = source_hash
+            stale_pages.append((source_path, dest_path))
+        # Only now that every page was checked are the unseen ones known to be deleted
+        removed = manifest.finish()
+        pages = stale_pages
+
+    if removed:
+        logger.info(
+            f"Generating {len(pages)} pages from {dir_path_content}"
+            f" ({removed} removed with their sources)"
+        )
+    else:
+        logger.info(f"Generating {len(pages)} pages from {dir_path_content}")
+    if options is None:
+        options = RenderOptions(basepath)
+    template = Template.from_file(template_path, basepath, options)
+    if pipeline:
+        return generate_pages_pipelined(
+            pages, template, options, manifest, source_hashes, jobs, cache
+        )
+    if jobs == 1:
+        for source_path, dest_path in pages:
+            logger.debug(f"Generating page from {source_path} to {dest_path}")
+            render_page(source_path, template, dest_path, cache, options, stream_min_size)
+            if manifest is not None:
+                manifest.record(source_path, source_hashes[source_path], dest_path)
+        return len(pages)
+
+    profiler = get_profiler()
+    indexer = get_indexer()
+    failures = []
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=worker_context(),
+        initializer=init_worker,
+        initargs=(cache,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                render_page_in_worker,
+                source_path,
+                template,
+                dest_path,
+                options,
+                profiler is not None,
+                stream_min_size,
+                indexer is not None,
+            )
+            for source_path, dest_path in pages
+        ]
+        for (source_path, dest_path), future in zip(pages, futures):
+            try:
+                snapshot, hits, misses, added, pages_index = future.result()
+            except Exception as e:
+                failures.append((source_path, e))
+                continue
+            logger.debug(f"Generated page from {source_path} to {dest_path}")
+            if profiler is not None:
+                profiler.merge(snapshot)
+            if indexer is not None:
+                indexer.merge(pages_index)
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+                cache.merge(added)
+            if manifest is not None:
+                manifest.record(source_path, source_hashes[source_path], dest_path)
+    if failures:
+        raise BuildError(failures)
+    return len(pages)
+
+
+def generate_pages_pipelined(
+    pages: list[tuple[str, Path]],
+    template: Template,
+    options: RenderOptions,
+    manifest: BuildManifest = None,
+    source_hashes: dict = None,
+    jobs: int = 1,
+    cache: BlockCache = None,
+) -> int:
+    """Function that builds pages through a reader thread, a pool of render processes
+    and a writer thread connected by bounded queues, so disk reads and writes overlap
+    with rendering instead of alternating with it.
+    
+    Args:
+        pages: A list of (source path, destination path) pairs to build
+        template: The compiled page template
+        options: Render settings such as the basepath
+        manifest: Optional build manifest that built pages are recorded in
+        source_hashes: The source hash of every page, required with a manifest
+        jobs: Number of render processes; None uses every CPU (default: 1)
+        cache: Optional cache of rendered blocks; each worker process renders into its own
+            copy, and the blocks the workers add are merged back into it
+        
+    Returns:
+        The number of pages generated
+        
+    Raises:
+        BuildError: If any page fails to build
+    """
+    profiler = get_profiler()
+    indexer = get_indexer()
+
+    def read_page(page):
+        source_path, dest_path = page
+        with open(source_path, "r") as md:
+            md_contents = md.read()
+        return (
+            source_path,
+            md_contents,
+            template,
+            options,
+            profiler is not None,
+            indexer is not None,
+        )
+
+    def write_page(page, result):
+        source_path, dest_path = page
+        html, snapshot, hits, misses, added, pages_index = result
+        write_html_file(dest_path, html)
+        logger.debug(f"Generated page from {source_path} to {dest_path}")
+        if profiler is not None:
+            profiler.merge(snapshot)
+        if indexer is not None:
+            indexer.merge(pages_index)
+        if cache is not None:
+            cache.hits += hits
+            cache.misses += misses
+            cache.merge(added)
+        if manifest is not None:
+            manifest.record(source_path, source_hashes[source_path], dest_path)
+
+    failures = run_pipeline(
+        pages,
+        read_page,
+        render_html_in_worker,
+        write_page,
+        jobs=jobs,
+        initializer=init_worker,
+        initargs=(cache,),
+    )
+    if failures:
+        raise BuildError(
+            sorted(((page[0], error) for page, error in failures), key=lambda f: f[0])
+        )
+    return len(pages)
+
+
+def generate_pages_incremental(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    basepath: str = "/",
+    manifest_path: str = "./.build_manifest.json",
+    *,
+    jobs: int = 1,
+    cache: BlockCache = None,
+    pipeline: bool = False,
+    options: RenderOptions = None,
+    stream_min_size: int = None,
+    shard: tuple[int, int] = None,
+) -> int:
+    """Function that generates only the pages whose source, template or basepath
+    changed since the build recorded in the manifest, then updates the manifest.
+    
+    Args:
+        dir_path_content: Path to the source directory containing markdown files
+        template_path: Path to the HTML template file
+        dest_dir_path: Path to the destination directory for generated HTML files
+        basepath: Base path for URLs in the HTML (default: "/")
+        manifest_path: Path to the manifest JSON file
+        jobs: Number of worker processes; None uses every CPU (default: 1)
+        cache: Optional cache of rendered blocks shared between pages
+        pipeline: Whether to overlap reading, rendering and writing pages in separate stages
+        options: Render settings such as fingerprinted asset URLs, minifying and image
+            attributes (default: RenderOptions(basepath))
+        stream_min_size: Sources of at least this many bytes are rendered block by block
+        shard: Optional (index, count) pair; only the pages of that shard are generated
+        
+    Returns:
+        The number of pages generated
     """
-    dir_content = os.listdir(dir_path_content)
-    for path in dir_content:
-        current_path = os.path.join(dir_path_content, path)
-        dest_path = os.path.join(dest_dir_path, path)
-        if os.path.isfile(current_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(current_path, template_path, dest_path, basepath)
-            continue
-        generate_pages_recursive(current_path, template_path, dest_path, basepath)
+    manifest = BuildManifest.load(manifest_path)
+    template_hash = hash_file(template_path)
+    if options is None:
+        options = RenderOptions(basepath)
+    options_key = options.cache_key()
+    if options_key != basepath:
+        # Changed assets, image sizes or minifying change every page's output, so
+        # they are folded into the template hash.
+        template_hash = hash_bytes(f"{template_hash}\0{options_key}".encode())
+    manifest.begin(template_hash, basepath)
+    try:
+        return generate_pages_recursive(
+            dir_path_content,
+            template_path,
+            dest_dir_path,
+            basepath,
+            manifest,
+            jobs=jobs,
+            cache=cache,
+            pipeline=pipeline,
+            options=options,
+            stream_min_size=stream_min_size,
+            shard=shard,
+        )
+    finally:
+        manifest.save(manifest_path)
 
 
 def write_html_file(dest_path: str, html_content: str) -> None:
     """Function that creates the destination directory and writes the HTML content to a file.
+    The file is replaced rather than written in place, so a hardlinked copy of the old
+    page is never changed.
     
     Args:
         dest_path: The destination file path for the HTML file
         html_content: The HTML content to write to the file
     """
-    path, file_name = os.path.split(dest_path)
-    os.makedirs(path, exist_ok=True)
-    with open(dest_path, "w") as html:
-        html.write(html_content)
+    with profile_stage("write"):
+        with replacing_file(dest_path) as html:
+            html.write(html_content)
@@ -1,6 +1,8 @@
 class HTMLNode:
     """Base class for HTML nodes in the document tree."""
     
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str = None,
@@ -32,6 +34,22 @@ class HTMLNode:
         """
         raise NotImplementedError
 
+    def write_html(self, fp) -> None:
+        """Write the node's HTML to a file-like object without building the full string.
+        
+        Args:
+            fp: A writable text file-like object
+        """
+        self._write(fp.write)
+
+    def _write(self, write) -> None:
+        """Pass the node's HTML in chunks to a write callable.
+        
+        Args:
+            write: A callable accepting a string, e.g. fp.write or list.append
+        """
+        write(self.to_html())
+
     def props_to_html(self) -> str:
         """Convert the node's properties dictionary to an HTML attribute string.
         
@@ -40,10 +58,7 @@ class HTMLNode:
         """
         if self.props is None:
             return ""
-        html_string = ""
-        for key, value in self.props.items():
-            html_string += f' {key}="{value}"'
-        return html_string
+        return "".join(f' {key}="{value}"' for key, value in self.props.items())
 
     def __eq__(self, other: object) -> bool:
         """Check equality with another HTMLNode.
@@ -73,6 +88,8 @@ class HTMLNode:
 class LeafNode(HTMLNode):
     """A leaf node in the HTML tree with no children, only a value."""
     
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: dict = None) -> None:
         """Initialize a leaf node with a tag, value, and optional properties.
         
@@ -110,6 +127,8 @@ class LeafNode(HTMLNode):
 class ParentNode(HTMLNode):
     """A parent node in the HTML tree that contains child nodes."""
     
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict = None) -> None:
         """Initialize a parent node with a tag, children, and optional properties.
         
@@ -129,14 +148,27 @@ class ParentNode(HTMLNode):
         Raises:
             ValueError: If the node has no tag or no children
         """
+        parts = []
+        self._write(parts.append)
+        return "".join(parts)
+
+    def _write(self, write) -> None:
+        """Pass the node's HTML in chunks to a write callable, recursing into children.
+        
+        Args:
+            write: A callable accepting a string, e.g. fp.write or list.append
+            
+        Raises:
+            ValueError: If the node or a descendant has no tag or no children
+        """
         if self.tag is None:
             raise ValueError("Invalid HTML: no tag")
         if self.children is None or len(self.children) == 0:
             raise ValueError("Invalid HTML: no children")
-        nested_html = ""
+        write(f"<{self.tag}{self.props_to_html()}>")
         for node in self.children:
-            nested_html += node.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{nested_html}</{self.tag}>"
+            node._write(write)
+        write(f"</{self.tag}>")
 
     def __repr__(self) -> str:
         """Return a string representation of the ParentNode for debugging.
@@ -0,0 +1,211 @@
+import logging
+import os
+import struct
+from src.manifest import load_json_state, refresh_file_entries, save_json_state
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+# JPEG start-of-frame markers, the segments that hold the image size
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers that stand alone, without a length field
+JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xDA)) | {0x01}
+
+
+def png_size(f) -> tuple[int, int]:
+    """Read the dimensions of a PNG image from its IHDR chunk.
+
+    Args:
+        f: A binary file positioned at the start of the image
+
+    Returns:
+        The (width, height) of the image, or None if it is not a PNG
+    """
+    header = f.read(24)
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def gif_size(f) -> tuple[int, int]:
+    """Read the dimensions of a GIF image from its logical screen descriptor.
+
+    Args:
+        f: A binary file positioned at the start of the image
+
+    Returns:
+        The (width, height) of the image, or None if it is not a GIF
+    """
+    header = f.read(10)
+    if len(header) < 10 or header[:6] not in (b"GIF87a", b"GIF89a"):
+        return None
+    return struct.unpack("<HH", header[6:10])
+
+
+def webp_size(f) -> tuple[int, int]:
+    """Read the dimensions of a WebP image from its first chunk.
+
+    Args:
+        f: A binary file positioned at the start of the image
+
+    Returns:
+        The (width, height) of the image, or None if it is not a WebP image
+    """
+    header = f.read(30)
+    if len(header) < 30 or header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+        return None
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def jpeg_size(f) -> tuple[int, int]:
+    """Read the dimensions of a JPEG image from its start-of-frame segment.
+
+    Segments before the frame header, such as EXIF data and embedded thumbnails,
+    are skipped by seeking past them, so only segment headers are read.
+
+    Args:
+        f: A binary file positioned at the start of the image
+
+    Returns:
+        The (width, height) of the image, or None if it is not a JPEG
+    """
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        byte = f.read(1)
+        if byte != b"\xff":
+            return None
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        if marker == 0xDA or length < 2:
+            # Entropy-coded data follows the start of scan; no frame header came first
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def image_size(path: str) -> tuple[int, int]:
+    """Read an image's dimensions from its header without reading the whole file.
+
+    Args:
+        path: The path of a PNG, JPEG, GIF or WebP image
+
+    Returns:
+        The (width, height) of the image, or None if the format is unknown or the
+        header is damaged
+    """
+    with open(path, "rb") as f:
+        start = f.read(4)
+        f.seek(0)
+        if start.startswith(b"\x89PNG"):
+            return png_size(f)
+        if start.startswith(b"GIF8"):
+            return gif_size(f)
+        if start == b"RIFF":
+            return webp_size(f)
+        if start.startswith(b"\xff\xd8"):
+            return jpeg_size(f)
+    return None
+
+
+def read_dimensions(path: str) -> dict:
+    """Read the dimensions of an image for its manifest entry, warning if they are unknown.
+
+    Args:
+        path: The path of the image
+
+    Returns:
+        A dictionary with the image's width and height, both None if they could not be read
+    """
+    size = image_size(path)
+    if size is None:
+        logger.warning(f"Could not read the dimensions of {path}")
+        return {"width": None, "height": None}
+    return {"width": size[0], "height": size[1]}
+
+
+class ImageManifest:
+    """Record of the dimensions of every static image, keyed by path, size and mtime."""
+
+    def __init__(self, images: dict = None) -> None:
+        """Initialize a manifest with per-image entries.
+
+        Args:
+            images: A dictionary mapping relative image paths to {size, mtime_ns, width, height} entries
+        """
+        self.images = images if images is not None else {}
+        self.read = 0
+
+    @classmethod
+    def load(cls, path: str) -> "ImageManifest":
+        """Load a manifest from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: The path to the manifest JSON file
+
+        Returns:
+            The loaded ImageManifest
+        """
+        return cls(load_json_state(path, "images"))
+
+    def save(self, path: str) -> None:
+        """Write the manifest to disk.
+
+        Args:
+            path: The path to the manifest JSON file
+        """
+        save_json_state(path, {"images": self.images})
+
+    def dimensions(self, source_path: str) -> dict[str, tuple[int, int]]:
+        """Return the dimensions of every image, reading only new or changed headers.
+
+        An image whose size and modification time match its entry keeps the
+        recorded dimensions. Entries of deleted images are dropped.
+
+        Args:
+            source_path: The path to the static directory
+
+        Returns:
+            A dictionary mapping root-relative image URLs, e.g. '/images/tom.png', to
+            (width, height); images whose header cannot be read are left out
+        """
+        self.images, self.read = refresh_file_entries(
+            self.images,
+            source_path,
+            lambda rel_path: rel_path.lower().endswith(IMAGE_EXTENSIONS),
+            read_dimensions,
+        )
+        sizes = {
+            f"/{rel_path}": (entry["width"], entry["height"])
+            for rel_path, entry in self.images.items()
+            if entry["width"] is not None
+        }
+        logger.debug(f"Measured {len(sizes)} images, {self.read} headers read")
+        return sizes
@@ -152,19 +152,74 @@ def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     return link_matches
 
 
+INLINE_TOKEN_PATTERN = re.compile(
+    r"!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<text>[^\[\]]*)\]\((?P<href>[^\(\)]*)\)"
+    r"|(?P<delimiter>`|_|\*\*)"
+)
+
+DELIMITER_TEXT_TYPES = {
+    None: TextType.TEXT,
+    "`": TextType.CODE,
+    "_": TextType.ITALIC,
+    "**": TextType.BOLD,
+}
+
+
 def text_to_textnodes(text: str) -> list[TextNode]:
     """Convert markdown text into a list of TextNode objects with appropriate formatting.
     
+    The text is tokenized in a single scan. The result is the same as applying
+    split_nodes_image, split_nodes_link and split_nodes_delimiter for code,
+    italic and bold in that order: delimiters inside code (and bold inside
+    italic) are literal, and whitespace-only text next to a link or image is dropped.
+    
     Args:
         text: A string containing markdown text with formatting
         
     Returns:
         A list of TextNode objects representing the formatted text
+        
+    Raises:
+        ValueError: If the markdown syntax is invalid (unmatched delimiters)
     """
-    unprocessed_text_node = [TextNode(text, TextType.TEXT)]
-    split_images = split_nodes_image(unprocessed_text_node)
-    split_links = split_nodes_link(split_images)
-    split_code = split_nodes_delimiter(split_links, "`", TextType.CODE)
-    split_italic = split_nodes_delimiter(split_code, "_", TextType.ITALIC)
-    split_bold = split_nodes_delimiter(split_italic, "**", TextType.BOLD)
-    return split_bold
+    nodes = []
+    open_delimiter = None
+    piece_start = 0
+    segment_start = 0
+    after_link = False
+    for match in INLINE_TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "delimiter":
+            delimiter = match.group(kind)
+            if open_delimiter is not None and open_delimiter != delimiter:
+                if open_delimiter == "`" or (open_delimiter == "_" and delimiter == "**"):
+                    continue
+                raise ValueError("Invalid Markdown syntax")
+            start = match.start()
+            if start != piece_start:
+                nodes.append(
+                    TextNode(text[piece_start:start], DELIMITER_TEXT_TYPES[open_delimiter])
+                )
+            open_delimiter = None if open_delimiter == delimiter else delimiter
+            piece_start = match.end()
+            continue
+
+        if open_delimiter is not None:
+            raise ValueError("Invalid Markdown syntax")
+        piece = text[piece_start : match.start()]
+        if piece and (piece_start != segment_start or not piece.isspace()):
+            nodes.append(TextNode(piece, TextType.TEXT))
+        if kind == "src":
+            nodes.append(TextNode(match.group("alt"), TextType.IMAGE, match.group("src")))
+        else:
+            nodes.append(TextNode(match.group("text"), TextType.LINK, match.group("href")))
+        piece_start = segment_start = match.end()
+        after_link = True
+
+    if open_delimiter is not None:
+        raise ValueError("Invalid Markdown syntax")
+    piece = text[piece_start:]
+    if piece and not (after_link and piece_start == segment_start and piece.isspace()):
+        nodes.append(TextNode(piece, TextType.TEXT))
+    return nodes
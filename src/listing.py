@@ -0,0 +1,288 @@
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+from src.generate_content import find_pages, replacing_file, write_html_file
+from src.htmlnode import LeafNode, ParentNode
+from src.inline_markdown import text_to_textnodes
+from src.manifest import BuildManifest, hash_file
+from src.markdown_blocks import BlockType, scan_blocks
+from src.render_options import RenderOptions
+from src.search_index import page_url
+from src.template import Template
+
+
+logger = logging.getLogger(__name__)
+
+FEED_NAME = "atom.xml"
+# Number of most recent pages listed in a feed
+FEED_SIZE = 20
+
+
+def scan_metadata(lines) -> dict:
+    """Scan markdown lines only up to the first h1 header and the first paragraph.
+
+    Args:
+        lines: An iterable of markdown lines, e.g. an open file
+
+    Returns:
+        A dictionary with the page's title and summary; either may be None
+    """
+    title = summary = None
+    for block, block_type, block_lines in scan_blocks(lines):
+        if title is None and block_type == BlockType.HEADING and block.startswith("# "):
+            title = block.lstrip("# ").strip()
+        elif summary is None and block_type == BlockType.PARAGRAPH:
+            text = " ".join(block_lines)
+            try:
+                summary = "".join(node.text for node in text_to_textnodes(text))
+            except ValueError:
+                summary = text
+        if title is not None and summary is not None:
+            break
+    return {"title": title, "summary": summary}
+
+
+def page_metadata(source_path: str, source_hash: str = None) -> dict:
+    """Read the listing metadata of a page from the head of its source.
+
+    Args:
+        source_path: Path to the source markdown file
+        source_hash: Hash of the source contents, if already known
+
+    Returns:
+        A dictionary with title, summary, mtime and the source_hash it was read from
+    """
+    with open(source_path, "r") as md:
+        metadata = scan_metadata(md)
+    metadata["mtime"] = os.stat(source_path).st_mtime
+    metadata["source_hash"] = source_hash or hash_file(source_path)
+    return metadata
+
+
+def collect_metadata(
+    pages: list[tuple[str, str]], manifest: BuildManifest = None
+) -> list[dict]:
+    """Return the metadata of pages, reusing what the manifest cached for unchanged sources.
+
+    Pages whose manifest entry has metadata read from the entry's current source
+    hash are not read at all. Metadata read for other pages is stored in their
+    manifest entries for the next build.
+
+    Args:
+        pages: A list of (source path, destination path) pairs
+        manifest: Optional build manifest of the pages
+
+    Returns:
+        A list of metadata dictionaries, each with the page's dest_path added
+    """
+    posts = []
+    read = 0
+    for source_path, dest_path in pages:
+        entry = manifest.pages.get(source_path) if manifest is not None else None
+        metadata = entry.get("metadata") if entry is not None else None
+        if metadata is None or metadata["source_hash"] != entry["source_hash"]:
+            metadata = page_metadata(
+                source_path, entry["source_hash"] if entry is not None else None
+            )
+            read += 1
+            if entry is not None:
+                entry["metadata"] = metadata
+        posts.append(dict(metadata, dest_path=str(dest_path)))
+    logger.debug(f"Collected metadata of {len(posts)} pages, {read} read from source")
+    return posts
+
+
+def format_time(timestamp: float) -> str:
+    """Format a modification time as an RFC 3339 UTC timestamp.
+
+    Args:
+        timestamp: Seconds since the epoch
+
+    Returns:
+        The timestamp, e.g. '2024-05-01T12:00:00+00:00'
+    """
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+def listing_node(
+    heading: str,
+    posts: list[dict],
+    newer_url: str = None,
+    older_url: str = None,
+    options: RenderOptions = None,
+) -> ParentNode:
+    """Build the content of one listing page.
+
+    Args:
+        heading: The listing's heading
+        posts: Metadata of the pages on this listing page, each with a url
+        newer_url: URL of the previous listing page, if any
+        older_url: URL of the next listing page, if any
+        options: Render settings used to rewrite the links
+
+    Returns:
+        A div holding the heading, the list of pages and the pagination links
+    """
+    options = options or RenderOptions()
+    items = []
+    for post in posts:
+        children = [
+            ParentNode(
+                "a", [LeafNode(None, post["title"])], {"href": options.rewrite_url(post["url"])}
+            ),
+            LeafNode(
+                "time", format_time(post["mtime"])[:10], {"datetime": format_time(post["mtime"])}
+            ),
+        ]
+        if post["summary"]:
+            children.append(LeafNode("p", post["summary"]))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", heading), ParentNode("ul", items)]
+    links = []
+    if newer_url is not None:
+        links.append(LeafNode("a", "Newer posts", {"href": options.rewrite_url(newer_url)}))
+    if older_url is not None:
+        links.append(LeafNode("a", "Older posts", {"href": options.rewrite_url(older_url)}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def atom_feed(
+    heading: str,
+    posts: list[dict],
+    listing_url: str,
+    site_url: str = "",
+    basepath: str = "/",
+) -> str:
+    """Render an Atom feed of the most recent pages.
+
+    Args:
+        heading: The feed title
+        posts: Metadata of the pages, newest first, each with a root-relative url
+        listing_url: Root-relative URL of the listing the feed belongs to
+        site_url: Scheme and host prepended to every URL, e.g. 'https://example.com'
+        basepath: Base path the site is served under (default: "/")
+
+    Returns:
+        The feed XML
+    """
+    site_url = site_url.rstrip("/") + basepath[:-1]
+    updated = format_time(max((post["mtime"] for post in posts), default=0))
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(heading)}</title>",
+        f"  <id>{escape(site_url + listing_url)}</id>",
+        f"  <link href={quoteattr(site_url + listing_url)} />",
+        f'  <link rel="self" href={quoteattr(site_url + listing_url + FEED_NAME)} />',
+        f"  <updated>{updated}</updated>",
+    ]
+    for post in posts[:FEED_SIZE]:
+        url = site_url + post["url"]
+        lines.extend(
+            [
+                "  <entry>",
+                f"    <title>{escape(post['title'])}</title>",
+                f"    <id>{escape(url)}</id>",
+                f"    <link href={quoteattr(url)} />",
+                f"    <updated>{format_time(post['mtime'])}</updated>",
+            ]
+        )
+        if post["summary"]:
+            lines.append(f"    <summary>{escape(post['summary'])}</summary>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def generate_listings(
+    dir_path_content: str,
+    section: str,
+    template_path: str,
+    dest_dir_path: str,
+    basepath: str = "/",
+    per_page: int = 10,
+    manifest: BuildManifest = None,
+    site_url: str = "",
+    options: RenderOptions = None,
+) -> int:
+    """Write the paginated listing pages and the Atom feed of a content directory.
+
+    Pages are listed newest first by source modification time. The first listing
+    page is the section's index unless the section has its own index page, in
+    which case every listing page lives under 'page/N/'.
+
+    Args:
+        dir_path_content: Path to the source directory containing markdown files
+        section: The directory to list, relative to the content directory, e.g. 'blog'
+        template_path: Path to the HTML template file
+        dest_dir_path: Path to the destination directory for generated HTML files
+        basepath: Base path for URLs in the HTML (default: "/")
+        per_page: Number of pages per listing page (default: 10)
+        manifest: Optional build manifest whose cached metadata is reused and updated
+        site_url: Scheme and host prepended to URLs in the feed
+        options: Render settings such as fingerprinted asset URLs and minifying
+            (default: RenderOptions(basepath))
+
+    Returns:
+        The number of listing pages written
+    """
+    section_content = os.path.join(dir_path_content, section)
+    section_dest = os.path.join(dest_dir_path, section)
+    section_index = Path(section_dest, "index.html")
+    pages = find_pages(section_content, section_dest)
+    own_index = any(dest_path == section_index for _, dest_path in pages)
+    pages = [page for page in pages if page[1] != section_index]
+    posts = collect_metadata(pages, manifest)
+    for post in posts:
+        post["url"] = page_url(post.pop("dest_path"), dest_dir_path, "/")
+        if post["title"] is None:
+            post["title"] = post["url"]
+    posts.sort(key=lambda post: (-post["mtime"], post["url"]))
+
+    heading = os.path.basename(os.path.normpath(section)).replace("-", " ").title()
+    listing_url = "/" + section.strip("/") + "/"
+    page_count = max(1, -(-len(posts) // per_page))
+    urls = [f"{listing_url}page/{number}/" for number in range(1, page_count + 1)]
+    if not own_index:
+        urls[0] = listing_url
+
+    if options is None:
+        options = RenderOptions(basepath)
+    template = Template.from_file(template_path, basepath, options)
+    for number, url in enumerate(urls):
+        title = heading if number == 0 else f"{heading} (page {number + 1})"
+        node = listing_node(
+            heading,
+            posts[number * per_page : (number + 1) * per_page],
+            urls[number - 1] if number > 0 else None,
+            urls[number + 1] if number + 1 < page_count else None,
+            options,
+        )
+        dest_path = os.path.join(dest_dir_path, url.strip("/"), "index.html")
+        write_html_file(dest_path, template.render(title, node.to_html()))
+
+    number = page_count + 1
+    while os.path.exists(os.path.join(section_dest, "page", str(number), "index.html")):
+        os.remove(os.path.join(section_dest, "page", str(number), "index.html"))
+        number += 1
+
+    with replacing_file(os.path.join(section_dest, FEED_NAME)) as f:
+        f.write(atom_feed(heading, posts, listing_url, site_url, basepath))
+    logger.info(f"Listed {len(posts)} pages of {section} on {page_count} pages")
+    return page_count
+
+
+def is_feed_file(rel_path: str) -> bool:
+    """Tell whether a destination file is a generated feed.
+
+    Args:
+        rel_path: The path of the file relative to the destination directory
+
+    Returns:
+        True if the file is an Atom feed written by generate_listings
+    """
+    return os.path.basename(rel_path) == FEED_NAME
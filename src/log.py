@@ -0,0 +1,40 @@
+import logging
+import logging.handlers
+import sys
+
+
+QUIET = logging.WARNING
+NORMAL = logging.INFO
+VERBOSE = logging.DEBUG
+
+logger = logging.getLogger("src")
+
+
+def configure_logging(level: int = NORMAL, stream=None, capacity: int = 1024) -> None:
+    """Send the generator's log records to a stream through an in-memory buffer.
+
+    Records are written in batches of `capacity`, on any warning or error, and
+    when flush_logs() is called, instead of one terminal write per line.
+
+    Args:
+        level: QUIET, NORMAL or VERBOSE (default: NORMAL)
+        stream: The stream to write to (default: sys.stdout)
+        capacity: The number of records buffered before writing (default: 1024)
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    target = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    target.setFormatter(logging.Formatter("%(message)s"))
+    handler = logging.handlers.MemoryHandler(
+        capacity, flushLevel=logging.WARNING, target=target
+    )
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def flush_logs() -> None:
+    """Write out every buffered log record."""
+    for handler in logger.handlers:
+        handler.flush()
@@ -1,31 +1,562 @@
-from src.copystatic import move_tree
-from src.generate_content import generate_pages_recursive
-import sys
+from src.assets import AssetManifest, asset_urls, publish_fingerprinted
+from src.copystatic import clear_tree, is_generated_file, recursive_copy, sync_tree
+from src.generate_content import (
+    find_pages,
+    generate_pages_recursive,
+    generate_pages_incremental,
+)
+from src.watch import SiteWatcher
+from src.profiling import enable_profiling, profile_stage
+from src.search_index import build_search_index, enable_indexing, is_index_file
+from src.listing import collect_metadata, generate_listings, is_feed_file
+from src.manifest import BuildManifest
+from src.block_cache import BlockCache
+from src.render_options import RenderOptions
+from src.compress import CompressionManifest, compress_tree
+from src.minify import MinifyCache
+from src.images import ImageManifest
+from src.shards import (
+    SHARD_MANIFEST,
+    SHARD_OUTPUT,
+    find_shard_dirs,
+    merge_shards,
+    parse_shard,
+    save_shard_info,
+    select_shard,
+)
+from src.log import NORMAL, QUIET, VERBOSE, configure_logging, flush_logs
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import logging
+import os
+import time
 
 
 dir_path_static = "./static"
 dir_path_public = "./public"
 dir_path_content = "./content"
 dir_path_docs = "./docs"
+manifest_path = "./.build_manifest.json"
+asset_manifest_path = "./.asset_manifest.json"
+compress_manifest_path = "./.compress_manifest.json"
+minify_cache_path = "./.minify_cache.json"
+image_manifest_path = "./.image_manifest.json"
+
+logger = logging.getLogger("src.main")
+
+# Flags that only apply to one-off builds; watch mode would silently ignore them
+WATCH_IGNORED_FLAGS = (
+    "--checksum",
+    "--hardlink",
+    "--fingerprint",
+    "--minify",
+    "--lazy-images",
+    "--gzip",
+    "--search",
+    "--listing",
+    "--profile",
+    "--block-cache",
+    "--jobs",
+    "--stream-min-size",
+    "--pipeline",
+)
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """Parse the command line arguments of the site generator.
+
+    Args:
+        argv: The argument list to parse (default: sys.argv[1:])
+
+    Returns:
+        The parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Build the static website.")
+    parser.add_argument(
+        "basepath", nargs="?", default="/", help="base path for URLs (default: /)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages whose source, template or basepath changed",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="build incrementally, then rebuild whenever content, static or the template change",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="with --incremental, compare static file contents when mtimes differ",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="hardlink static files into the output instead of copying them when on the same filesystem",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also publish static assets under content-hashed names and link pages to those",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip whitespace and comments from the page template and static stylesheets",
+    )
+    parser.add_argument(
+        "--lazy-images",
+        action="store_true",
+        help="give images their width and height from static/ and load them lazily",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write a precompressed .gz variant next to every text output",
+    )
+    parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=1024,
+        metavar="BYTES",
+        help="with --gzip, skip files smaller than BYTES (default: 1024)",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded full-text search index to docs/search/",
+    )
+    parser.add_argument(
+        "--listing",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="write paginated listing pages and an Atom feed of the content directory DIR, e.g. blog",
+    )
+    parser.add_argument(
+        "--listing-size",
+        type=int,
+        default=10,
+        metavar="N",
+        help="with --listing, list N pages per listing page (default: 10)",
+    )
+    parser.add_argument(
+        "--site-url",
+        default="",
+        metavar="URL",
+        help="scheme and host the site is served from, used for absolute URLs in feeds",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each build stage and print a summary at the end",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="with --profile, also write the summary as JSON to PATH",
+    )
+    parser.add_argument(
+        "--block-cache",
+        type=int,
+        default=0,
+        metavar="SIZE",
+        help="render identical markdown blocks once, keeping up to SIZE blocks (default: off)",
+    )
+    parser.add_argument(
+        "--block-cache-file",
+        metavar="PATH",
+        help="with --block-cache, load and save the cache at PATH between builds",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        action="store_const",
+        dest="log_level",
+        const=QUIET,
+        default=NORMAL,
+        help="only report warnings and errors",
+    )
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        action="store_const",
+        dest="log_level",
+        const=VERBOSE,
+        help="report every file copied and every page generated",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes rendering pages; 0 uses every CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--stream-min-size",
+        type=int,
+        metavar="BYTES",
+        help="render sources of at least BYTES block by block straight to their output file",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, rendering (in --jobs processes) and writing pages",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="only render the pages of shard I of N, into the shards directory",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="copy the static files and combine every shard of the shards directory into docs/",
+    )
+    parser.add_argument(
+        "--shards-dir",
+        default="./shards",
+        metavar="DIR",
+        help="with --shard or --merge, the directory holding one directory per shard"
+        " (default: ./shards)",
+    )
+    args = parser.parse_args(argv)
+    if args.listing_size < 1:
+        parser.error("--listing-size must be positive")
+    for section in args.listing:
+        if not os.path.isdir(os.path.join(dir_path_content, section)):
+            parser.error(f"--listing {section}: no such directory in {dir_path_content}")
+    if args.watch:
+        ignored = []
+        for flag in WATCH_IGNORED_FLAGS:
+            dest = flag[2:].replace("-", "_")
+            if getattr(args, dest) != parser.get_default(dest):
+                ignored.append(flag)
+        if ignored:
+            parser.error(f"--watch cannot be combined with {', '.join(ignored)}")
+    if args.shard is not None and (args.merge or args.watch or args.gzip):
+        parser.error("--shard cannot be combined with --merge, --watch or --gzip")
+    if args.merge and (args.incremental or args.watch):
+        parser.error("--merge cannot be combined with --incremental or --watch")
+    if args.jobs < 0:
+        parser.error("--jobs must not be negative")
+    if args.jobs == 0:
+        args.jobs = None
+    return args
+
+
+def keep_outputs(published: set = frozenset()):
+    """Return the predicate of output files that syncing the static files must keep.
+
+    Args:
+        published: Destination-relative paths of the published fingerprinted assets
+
+    Returns:
+        A predicate on destination-relative paths, true for generated pages and
+        their precompressed variants, search index files, feeds and published assets
+    """
+    return lambda path: (
+        is_generated_file(path)
+        or path in published
+        or is_index_file(path)
+        or is_feed_file(path)
+    )
+
+
+def render_settings(args: argparse.Namespace) -> tuple[dict, RenderOptions]:
+    """Read the static files' fingerprints and image sizes that pages are rendered with.
+
+    Args:
+        args: The parsed command line arguments
+
+    Returns:
+        A tuple with the fingerprinted asset paths and the render options of the
+        build's pages
+    """
+    fingerprints = {}
+    asset_map = None
+    if args.fingerprint:
+        assets = AssetManifest.load(asset_manifest_path)
+        fingerprints = assets.fingerprint(dir_path_static, args.minify)
+        assets.save(asset_manifest_path)
+        asset_map = asset_urls(fingerprints)
+    image_sizes = None
+    if args.lazy_images:
+        images = ImageManifest.load(image_manifest_path)
+        image_sizes = images.dimensions(dir_path_static)
+        images.save(image_manifest_path)
+    return fingerprints, RenderOptions(args.basepath, asset_map, args.minify, image_sizes)
+
+
+def build(args: argparse.Namespace, cache: BlockCache = None) -> tuple[int, int]:
+    """Copy the static files and generate every page once.
+
+    A full build copies the static files in a background thread while the pages
+    are generated. Static files with the same path as a generated page are not
+    copied, so pages take precedence as they did when copying came first. With
+    --merge, the pages are taken from the shards instead of being generated.
+
+    Args:
+        args: The parsed command line arguments
+        cache: Optional cache of rendered blocks
+
+    Returns:
+        A tuple with the number of static files copied and the number of pages built
+    """
+    minify_cache = MinifyCache.load(minify_cache_path) if args.minify else None
+    fingerprints, options = render_settings(args)
+    if args.incremental:
+        published = {os.path.normpath(path) for path in fingerprints.values()}
+        copied, removed = sync_tree(
+            dir_path_static,
+            dir_path_docs,
+            checksum=args.checksum,
+            keep=keep_outputs(published),
+            link=args.hardlink,
+            minify_cache=minify_cache,
+        )
+        publish_fingerprinted(
+            dir_path_static, dir_path_docs, fingerprints, args.hardlink, minify_cache
+        )
+        built = generate_pages_incremental(
+            dir_path_content,
+            "./template.html",
+            dir_path_docs,
+            args.basepath,
+            manifest_path,
+            jobs=args.jobs,
+            cache=cache,
+            pipeline=args.pipeline,
+            options=options,
+            stream_min_size=args.stream_min_size,
+        )
+        if args.listing:
+            manifest = BuildManifest.load(manifest_path)
+            build_listings(args, manifest, options)
+            manifest.save(manifest_path)
+        if minify_cache is not None:
+            minify_cache.save(minify_cache_path)
+        return copied, built
+    clear_tree(dir_path_docs)
+    pages = {
+        os.path.relpath(dest_path, dir_path_docs)
+        for _, dest_path in find_pages(dir_path_content, dir_path_docs)
+    }
+    with ThreadPoolExecutor(max_workers=1) as copier:
+        copy = copier.submit(
+            recursive_copy,
+            dir_path_static,
+            dir_path_docs,
+            args.hardlink,
+            exclude=pages,
+            minify_cache=minify_cache,
+        )
+        publish = copier.submit(
+            publish_fingerprinted,
+            dir_path_static,
+            dir_path_docs,
+            fingerprints,
+            args.hardlink,
+            minify_cache,
+        )
+        if args.merge:
+            built = merge_shards(
+                find_shard_dirs(args.shards_dir),
+                dir_path_docs,
+                manifest_path,
+                args.hardlink,
+                args.basepath,
+                options.cache_key(),
+            )
+        else:
+            built = generate_pages_recursive(
+                dir_path_content,
+                "./template.html",
+                dir_path_docs,
+                args.basepath,
+                jobs=args.jobs,
+                cache=cache,
+                pipeline=args.pipeline,
+                options=options,
+                stream_min_size=args.stream_min_size,
+            )
+        copied = copy.result()
+        publish.result()
+    if args.merge:
+        # The shards cached the metadata of their pages in the merged manifest
+        manifest = BuildManifest.load(manifest_path)
+        build_listings(args, manifest, options)
+        manifest.save(manifest_path)
+    else:
+        build_listings(args, None, options)
+    if minify_cache is not None:
+        minify_cache.save(minify_cache_path, prune=True)
+    return copied, built
+
+
+def shard_directory(args: argparse.Namespace) -> str:
+    """Return the directory the shard's pages and manifest are written to.
+
+    Args:
+        args: The parsed command line arguments of a --shard build
+
+    Returns:
+        The shard's directory under the shards directory
+    """
+    return os.path.join(args.shards_dir, str(args.shard[0]))
+
+
+def build_shard(args: argparse.Namespace, cache: BlockCache = None) -> int:
+    """Generate the pages of one shard into the shard's own directory.
+
+    Static files, listing pages and feeds are left to the merge step. The shard's
+    manifest makes repeated builds of the same shard directory incremental, and
+    with --listing it also caches the metadata of the shard's pages so the merge
+    step does not read them again.
+
+    Args:
+        args: The parsed command line arguments
+        cache: Optional cache of rendered blocks
+
+    Returns:
+        The number of pages built
+    """
+    shard_dir = shard_directory(args)
+    shard_manifest_path = os.path.join(shard_dir, SHARD_MANIFEST)
+    _, options = render_settings(args)
+    save_shard_info(shard_dir, args.shard, args.basepath, options.cache_key())
+    built = generate_pages_incremental(
+        dir_path_content,
+        "./template.html",
+        os.path.join(shard_dir, SHARD_OUTPUT),
+        args.basepath,
+        shard_manifest_path,
+        jobs=args.jobs,
+        cache=cache,
+        pipeline=args.pipeline,
+        options=options,
+        stream_min_size=args.stream_min_size,
+        shard=args.shard,
+    )
+    if args.listing:
+        sections = tuple(
+            os.path.join(dir_path_content, section) + os.sep for section in args.listing
+        )
+        manifest = BuildManifest.load(shard_manifest_path)
+        collect_metadata(
+            [
+                (source_path, entry["output_path"])
+                for source_path, entry in manifest.pages.items()
+                if source_path.startswith(sections)
+            ],
+            manifest,
+        )
+        manifest.save(shard_manifest_path)
+    return built
+
+
+def build_listings(
+    args: argparse.Namespace, manifest: BuildManifest = None, options: RenderOptions = None
+) -> None:
+    """Write the listing pages and feed of every directory passed with --listing.
+
+    Args:
+        args: The parsed command line arguments
+        manifest: Optional build manifest whose cached page metadata is reused
+        options: The render options of the build's pages
+    """
+    for section in args.listing:
+        generate_listings(
+            dir_path_content,
+            section,
+            "./template.html",
+            dir_path_docs,
+            args.basepath,
+            per_page=args.listing_size,
+            manifest=manifest,
+            site_url=args.site_url,
+            options=options,
+        )
+
+
+def compress(args: argparse.Namespace) -> None:
+    """Write precompressed variants of the text outputs that changed since the last build.
+
+    Args:
+        args: The parsed command line arguments
+    """
+    manifest = CompressionManifest.load(compress_manifest_path)
+    with profile_stage("compress"):
+        compressed, unchanged = compress_tree(dir_path_docs, manifest, args.gzip_min_size)
+    manifest.save(compress_manifest_path)
+    logger.info(f"Compressed {compressed} files ({unchanged} unchanged)")
 
 
 def main() -> None:
     """Main entry point for the static site generator.
-    
+
     Copies static files to the docs directory and generates HTML pages
     from markdown content. Optionally accepts a basepath argument from
     command line for configuring URL paths.
     """
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    move_tree(
-        dir_path_static,
-        dir_path_docs,
-    )
-    generate_pages_recursive(
-        dir_path_content, "./template.html", dir_path_docs, basepath
-    )
+    args = parse_args()
+    configure_logging(args.log_level)
+    if args.watch:
+        SiteWatcher(
+            dir_path_content,
+            dir_path_static,
+            "./template.html",
+            dir_path_docs,
+            args.basepath,
+            manifest_path,
+            keep_outputs(),
+        ).run()
+        flush_logs()
+        return
+    profiler = enable_profiling() if args.profile else None
+    cache = None
+    if args.block_cache > 0:
+        if args.block_cache_file:
+            cache = BlockCache.load(args.block_cache_file, args.block_cache)
+        else:
+            cache = BlockCache(args.block_cache)
+    indexer = enable_indexing() if args.search else None
+    start = time.perf_counter()
+    try:
+        if args.shard is not None:
+            copied, built = 0, build_shard(args, cache)
+            output = os.path.join(shard_directory(args), SHARD_OUTPUT)
+        else:
+            copied, built = build(args, cache)
+            output = dir_path_docs
+        if indexer is not None:
+            pages = find_pages(dir_path_content, output)
+            if args.shard is not None:
+                pages = select_shard(pages, dir_path_content, args.shard)
+            with profile_stage("search"):
+                indexed, merged = build_search_index(
+                    pages, output, args.basepath, indexer
+                )
+            logger.info(f"Indexed {indexed} pages for search ({merged} unchanged)")
+        if args.gzip:
+            compress(args)
+        logger.info(
+            f"Copied {copied} static files and built {built} pages"
+            f" in {time.perf_counter() - start:.2f}s"
+        )
+        if cache is not None:
+            logger.info(f"Block cache: {cache.hits} hits, {cache.misses} misses")
+            if args.block_cache_file:
+                cache.save(args.block_cache_file)
+    finally:
+        flush_logs()
+    if profiler is not None:
+        print(profiler.report())
+        if args.profile_json:
+            profiler.save(args.profile_json)
 
 
 if __name__ == "__main__":
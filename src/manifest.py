@@ -0,0 +1,245 @@
+import hashlib
+import json
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used to fingerprint build inputs.
+
+    Args:
+        data: The bytes to hash
+
+    Returns:
+        A sha256 hex digest of the data
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """Return the hex digest of a file's contents.
+
+    Args:
+        path: The path to the file to hash
+
+    Returns:
+        A sha256 hex digest of the file contents
+    """
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def load_json_state(path: str, key: str = None) -> dict:
+    """Load a dictionary kept between builds in a JSON file.
+
+    Args:
+        path: The path to the JSON file
+        key: Optional top-level key whose dictionary is returned instead of the whole file
+
+    Returns:
+        The dictionary, or None if the file is missing, unreadable or does not
+        hold a dictionary where one is expected
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    if key is None:
+        return data
+    value = data.get(key)
+    return value if isinstance(value, dict) else None
+
+
+def save_json_state(path: str, data: dict) -> None:
+    """Write a dictionary kept between builds to a JSON file, with sorted keys so
+    that unchanged state is written identically.
+
+    Args:
+        path: The path to the JSON file
+        data: The dictionary to write
+    """
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def refresh_file_entries(
+    entries: dict, root: str, include, compute
+) -> tuple[dict, int]:
+    """Bring per-file entries up to date with a directory, recomputing the values of
+    a file only when its size or modification time changed.
+
+    Args:
+        entries: The recorded entries, mapping '/'-separated paths relative to root to
+            dictionaries of the file's size, mtime_ns and computed values
+        root: The directory to walk
+        include: Predicate on the relative paths of the files that get entries
+        compute: Callable returning the dictionary of values of a new or changed
+            file, given its path
+
+    Returns:
+        A tuple with the current entries, which leave out deleted files, and the
+        number of files whose values were computed
+    """
+    current = {}
+    computed = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        for fname in filenames:
+            current_path = os.path.join(dirpath, fname)
+            rel_path = os.path.relpath(current_path, root).replace(os.sep, "/")
+            if not include(rel_path):
+                continue
+            stat = os.stat(current_path)
+            entry = entries.get(rel_path)
+            if (
+                entry is None
+                or entry["size"] != stat.st_size
+                or entry["mtime_ns"] != stat.st_mtime_ns
+            ):
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                entry.update(compute(current_path))
+                computed += 1
+            current[rel_path] = entry
+    return current, computed
+
+
+class BuildManifest:
+    """Record of the inputs every generated page was last built from."""
+
+    def __init__(
+        self, template_hash: str = None, basepath: str = None, pages: dict = None
+    ) -> None:
+        """Initialize a manifest with the build-wide inputs and per-page entries.
+
+        Args:
+            template_hash: Hash of the template the pages were built with
+            basepath: Base path the pages were built with
+            pages: A dictionary mapping source paths to their page entries
+        """
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.pages = pages if pages is not None else {}
+        self._seen = set()
+        self._outputs = set()
+        self._dropped = {}
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """Load a manifest from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: The path to the manifest JSON file
+
+        Returns:
+            The loaded BuildManifest
+        """
+        data = load_json_state(path)
+        if data is None:
+            return cls()
+        return cls(data.get("template_hash"), data.get("basepath"), data.get("pages"))
+
+    def save(self, path: str) -> None:
+        """Write the manifest to disk.
+
+        Args:
+            path: The path to the manifest JSON file
+        """
+        save_json_state(
+            path,
+            {
+                "template_hash": self.template_hash,
+                "basepath": self.basepath,
+                "pages": self.pages,
+            },
+        )
+
+    def begin(self, template_hash: str, basepath: str) -> None:
+        """Start a build, dropping every page entry if the build-wide inputs changed.
+
+        Args:
+            template_hash: Hash of the template used for this build
+            basepath: Base path used for this build
+        """
+        if template_hash != self.template_hash or basepath != self.basepath:
+            # Kept aside so finish() can still delete the outputs of deleted sources
+            self._dropped = self.pages
+            self.pages = {}
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self._seen = set()
+        self._outputs = set()
+
+    def is_current(self, source_path: str, source_hash: str, dest_path: str) -> bool:
+        """Check whether a page's recorded output is still up to date.
+
+        Args:
+            source_path: Path to the source markdown file
+            source_hash: Hash of the current source contents
+            dest_path: Path where the page's HTML is written
+
+        Returns:
+            True if the page was built from the same inputs and its output still exists
+        """
+        self._seen.add(source_path)
+        self._outputs.add(str(dest_path))
+        entry = self.pages.get(source_path)
+        if entry is None:
+            return False
+        return (
+            entry["source_hash"] == source_hash
+            and entry["output_path"] == str(dest_path)
+            and os.path.exists(dest_path)
+        )
+
+    def record(self, source_path: str, source_hash: str, dest_path: str) -> None:
+        """Record the inputs a page was just built from.
+
+        Args:
+            source_path: Path to the source markdown file
+            source_hash: Hash of the source contents
+            dest_path: Path where the page's HTML was written
+        """
+        self._seen.add(source_path)
+        self._outputs.add(str(dest_path))
+        self.pages[source_path] = {
+            "source_hash": source_hash,
+            "output_path": str(dest_path),
+        }
+
+    def forget(self, source_path: str) -> None:
+        """Drop the entry of a page whose source was deleted.
+
+        Args:
+            source_path: Path to the deleted source markdown file
+        """
+        self.pages.pop(source_path, None)
+
+    def finish(self) -> int:
+        """End a build's check of its pages, forgetting pages whose sources were not seen.
+
+        Only call this once every page of the build was checked, since any page
+        not seen by then is taken to be deleted.
+
+        The recorded output of a forgotten page is deleted too, unless a page seen
+        during the build writes to the same path.
+
+        Returns:
+            The number of outputs deleted
+        """
+        removed = 0
+        for pages in (self._dropped, self.pages):
+            for source_path in list(pages):
+                if source_path in self._seen:
+                    continue
+                output_path = pages.pop(source_path)["output_path"]
+                if output_path not in self._outputs and os.path.exists(output_path):
+                    os.remove(output_path)
+                    removed += 1
+                    logger.debug(f"Removed {output_path}")
+        self._dropped = {}
+        return removed
@@ -2,6 +2,8 @@ from enum import Enum
 from src.htmlnode import LeafNode, ParentNode
 from src.textnode import TextNode, TextType, text_node_to_html_node
 from src.inline_markdown import text_to_textnodes
+from src.profiling import profile_stage
+from src.render_options import RenderOptions
 
 
 class BlockType(Enum):
@@ -17,37 +19,35 @@ def markdown_to_blocks(markdown_text: str) -> list[str]:
     """Function that splits a markdown file into a list of separated strings
     that will be converted to html blocks"""
 
-    blocks = markdown_text.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
-            continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
+    return [block for block, _, _ in scan_blocks(markdown_text.split("\n"))]
 
 
 def block_to_block_type(markdown_block: str) -> BlockType:
     """Function that checks and returns the type of HTML block a markdown block is
     and returns the BlockType"""
 
-    lines = markdown_block.split("\n")
+    return lines_to_block_type(markdown_block.split("\n"))
+
 
-    if markdown_block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+def lines_to_block_type(lines: list[str]) -> BlockType:
+    """Function that classifies a block from its already split lines"""
+
+    first = lines[0]
+    if first.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
         return BlockType.HEADING
-    elif len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    elif len(lines) > 1 and first.startswith("```") and lines[-1].lstrip().startswith("```"):
         return BlockType.CODE
-    elif markdown_block.startswith(">"):
+    elif first.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
-    elif markdown_block.startswith(("- ", "* ")):
+    elif first.startswith(("- ", "* ")):
         for line in lines:
             if not line.startswith(("- ", "* ")):
                 return BlockType.PARAGRAPH
         return BlockType.ULIST
-    elif markdown_block.startswith("1. "):
+    elif first.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -57,47 +57,208 @@ def block_to_block_type(markdown_block: str) -> BlockType:
     return BlockType.PARAGRAPH
 
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    """Function that converts a full markdown document into a parent Parentnode with multiple children"""
-
-    markdown_blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in markdown_blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
+def scan_blocks(lines, fences: bool = True):
+    """Generator that scans markdown lines once, yielding (block, block type, block lines)
+    for every run of non-blank lines. A run opened by a ``` fence continues over blank
+    lines up to its closing fence, so code blocks are never split. Lines may keep their
+    trailing newline, so an open file can be scanned directly."""
+
+    run = []
+    fence = None
+    for line in lines:
+        line = line.rstrip("\n")
+        if fence is not None:
+            fence.append(line)
+            if _closes_fence(line):
+                run.extend(fence)
+                fence = None
+            continue
+        if line == "":
+            if run:
+                yield from _finish_block(run)
+                run = []
+            continue
+        if fences and not run and _opens_fence(line):
+            fence = [line]
+            continue
+        run.append(line)
+    if fence is not None:
+        # An unclosed fence is plain text: split it at blank lines like any other run.
+        yield from scan_blocks(fence, fences=False)
+    elif run:
+        yield from _finish_block(run)
+
+
+def _opens_fence(line: str) -> bool:
+    """Helper that tells whether a line opens a code fence: ``` followed by an optional
+    info string without backticks, so a line starting with an inline ```code``` span
+    does not"""
+
+    line = line.strip()
+    return line.startswith("```") and "`" not in line[3:]
+
+
+def _closes_fence(line: str) -> bool:
+    """Helper that tells whether a line closes a code fence: nothing but three or more
+    backticks, with surrounding whitespace stripped as for an opening fence"""
+
+    line = line.strip()
+    return len(line) >= 3 and line == "`" * len(line)
+
+
+def _finish_block(run: list[str]):
+    """Helper generator that strips a run of lines like str.strip would strip the joined
+    block, then yields the classified block unless only whitespace was left"""
+
+    while run and not run[0].strip():
+        run.pop(0)
+    while run and not run[-1].strip():
+        run.pop()
+    if not run:
+        return
+    run[0] = run[0].lstrip()
+    run[-1] = run[-1].rstrip()
+    yield "\n".join(run), lines_to_block_type(run), run
+
+
+class Document:
+    """A markdown document parsed once into typed blocks, with its title and heading outline"""
+
+    def __init__(
+        self,
+        blocks: list[str],
+        block_types: list[BlockType],
+        block_lines: list[list[str]] = None,
+    ) -> None:
+        self.blocks = blocks
+        self.block_types = block_types
+        self.block_lines = block_lines if block_lines is not None else [None] * len(blocks)
+        self.title = None
+        self.outline = []
+        for block, block_type in zip(blocks, block_types):
+            if block_type != BlockType.HEADING:
+                continue
+            level = len(block) - len(block.lstrip("#"))
+            self.outline.append((level, block[level + 1 :].strip()))
+            if self.title is None and level == 1:
+                self.title = block.lstrip("# ").strip()
+
+
+def parse_document(markdown: str) -> Document:
+    """Function that splits and classifies a markdown document's blocks in one parse"""
+
+    blocks, block_types, block_lines = [], [], []
+    with profile_stage("blocks"):
+        for block, block_type, lines in scan_blocks(markdown.split("\n")):
+            blocks.append(block)
+            block_types.append(block_type)
+            block_lines.append(lines)
+    return Document(blocks, block_types, block_lines)
+
+
+def scan_title(lines) -> str:
+    """Function that scans markdown lines only up to the first level-1 heading and
+    returns its text, or None if there is none"""
+
+    for block, block_type, _ in scan_blocks(lines):
+        if block_type == BlockType.HEADING and block.startswith("# "):
+            return block.lstrip("# ").strip()
+    return None
+
+
+class BlockStream:
+    """Page content that scans and renders markdown lines one block at a time while it
+    is written, so only the current block is held in memory"""
+
+    def __init__(
+        self, lines, cache=None, options: RenderOptions = None, on_block=None
+    ) -> None:
+        self.lines = lines
+        self.cache = cache
+        self.options = options
+        self.on_block = on_block
+
+    def write_html(self, fp) -> None:
+        """Write the content's HTML to a file-like object, the same HTML document_to_html_node renders.
+        The on_block callback, if any, sees every block's text, type and lines first."""
+
+        fp.write("<div>")
+        for block, block_type, lines in scan_blocks(self.lines):
+            if self.on_block is not None:
+                self.on_block(block, block_type, lines)
+            if self.cache is None:
+                block_to_html_node(block, block_type, self.options, lines).write_html(fp)
+            else:
+                fp.write(self.cache.render(block, block_type, self.options))
+        fp.write("</div>")
+
+
+def markdown_to_html_node(
+    markdown: str, cache=None, options: RenderOptions = None
+) -> ParentNode:
+    """Function that converts a full markdown document into a parent Parentnode with multiple children.
+    When a BlockCache is given, each block becomes a raw HTML leaf rendered through the cache."""
+
+    return document_to_html_node(parse_document(markdown), cache, options)
+
+
+def document_to_html_node(
+    document: Document, cache=None, options: RenderOptions = None
+) -> ParentNode:
+    """Function that converts an already parsed document into a parent Parentnode with multiple children"""
+
+    with profile_stage("tree"):
+        children = []
+        for block, block_type, lines in zip(
+            document.blocks, document.block_types, document.block_lines
+        ):
+            if cache is None:
+                html_node = block_to_html_node(block, block_type, options, lines)
+            else:
+                html_node = LeafNode(None, cache.render(block, block_type, options))
+            children.append(html_node)
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block: str) -> ParentNode:
-    """Helper function that returns an html node based on the block type calling {BlockType}_to_html_node functions"""
-    block_type = block_to_block_type(block)
+def block_to_html_node(
+    block: str,
+    block_type: BlockType = None,
+    options: RenderOptions = None,
+    lines: list[str] = None,
+) -> ParentNode:
+    """Helper function that returns an html node based on the block type calling {BlockType}_to_html_node functions.
+    The block is classified first unless its type is already known, and its lines are
+    reused when the scanner already split them."""
+    if block_type is None:
+        block_type = block_to_block_type(block)
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(block, options, lines)
     if block_type == BlockType.CODE:
         return code_to_html_node(block)
     if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(block, options, lines)
     if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(block, options, lines)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, options)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(block, options, lines)
     raise ValueError("invalid block type")
 
 
-def text_to_children(text: str) -> list[LeafNode]:
+def text_to_children(text: str, options: RenderOptions = None) -> list[LeafNode]:
     """Helper function that takes a string and returns a list of LeafNodes"""
 
     children_nodes = []
-    text_nodes = text_to_textnodes(text)
+    with profile_stage("inline"):
+        text_nodes = text_to_textnodes(text)
     for node in text_nodes:
-        new_html_node = text_node_to_html_node(node)
+        new_html_node = text_node_to_html_node(node, options)
         children_nodes.append(new_html_node)
     return children_nodes
 
 
-def heading_to_html_node(block: str) -> ParentNode:
+def heading_to_html_node(block: str, options: RenderOptions = None) -> ParentNode:
     """Helper function that creates a ParentNode from a heading markdown block"""
 
     level = 0
@@ -109,7 +270,7 @@ def heading_to_html_node(block: str) -> ParentNode:
     if level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1 :]
-    children = text_to_children(text)
+    children = text_to_children(text, options)
     return ParentNode(f"h{level}", children)
 
 
@@ -126,48 +287,57 @@ def code_to_html_node(block: str) -> ParentNode:
     return ParentNode("pre", [code])
 
 
-def ulist_to_html_node(block: str) -> ParentNode:
+def ulist_to_html_node(
+    block: str, options: RenderOptions = None, lines: list[str] = None
+) -> ParentNode:
     """Helper function that returns a unordered list Parent node from a text block"""
 
-    split_block = block.split("\n")
+    split_block = lines if lines is not None else block.split("\n")
     html_items = []
     for item in split_block:
         text = item[2:]
-        html_children = text_to_children(text)
+        html_children = text_to_children(text, options)
         html_items.append(ParentNode("li", html_children))
     return ParentNode("ul", html_items)
 
 
-def olist_to_html_node(block: str) -> ParentNode:
+def olist_to_html_node(
+    block: str, options: RenderOptions = None, lines: list[str] = None
+) -> ParentNode:
     """Helper function that returns an ordered list parent node from a text block"""
 
-    split_block = block.split("\n")
+    split_block = lines if lines is not None else block.split("\n")
     html_items = []
     for item in split_block:
         text = item[3:]
-        html_children = text_to_children(text)
+        html_children = text_to_children(text, options)
         html_items.append(ParentNode("li", html_children))
     return ParentNode("ol", html_items)
 
 
-def quote_to_html_node(block: str) -> ParentNode:
+def quote_to_html_node(
+    block: str, options: RenderOptions = None, lines: list[str] = None
+) -> ParentNode:
     """Helper function that returns a quote parent node from a text block"""
 
-    split_block = block.splitlines()
+    split_block = lines if lines is not None else block.splitlines()
     new_lines = []
     for line in split_block:
         if not line.startswith(">"):
             raise ValueError("Invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, options)
     return ParentNode("blockquote", children)
 
 
-def paragraph_to_html_node(block: str) -> ParentNode:
+def paragraph_to_html_node(
+    block: str, options: RenderOptions = None, lines: list[str] = None
+) -> ParentNode:
     """Helper function that returns a paragraph parent node from a text block"""
 
-    lines = block.split("\n")
+    if lines is None:
+        lines = block.split("\n")
     paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph, options)
     return ParentNode("p", children)
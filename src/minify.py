@@ -0,0 +1,217 @@
+import logging
+import os
+import re
+import threading
+from src.manifest import hash_bytes, load_json_state, save_json_state
+
+
+logger = logging.getLogger(__name__)
+
+# Elements whose contents are copied verbatim; whitespace inside them is significant
+# or not HTML at all
+RAW_ELEMENTS = "pre|textarea|script|style"
+HTML_TOKEN_PATTERN = re.compile(
+    rf"(<({RAW_ELEMENTS})\b.*?</\2\s*>|<!--.*?-->|<[!/a-zA-Z][^>]*>)", re.S | re.I
+)
+TAG_NAME_PATTERN = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)")
+# Elements that never render the whitespace around them
+BLOCK_ELEMENTS = set(
+    "html head body title meta link base script style noscript template article aside"
+    " div footer header main nav section p pre blockquote ul ol li dl dt dd h1 h2 h3 h4"
+    " h5 h6 hr br table thead tbody tfoot tr th td form fieldset figure figcaption".split()
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+CSS_TOKEN_PATTERN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/)", re.S)
+CSS_PUNCTUATION_PATTERN = re.compile(r" ?([{};,>]) ?")
+# A property name followed by a space and a colon, at the start of a declaration that
+# ends before any block opens, so selectors such as 'a :hover {' are left alone
+CSS_DECLARATION_PATTERN = re.compile(r"([{;][-\w]+) :(?=[^{};]*[;}])")
+# Stands in for strings and license comments while the code around them is minified
+CSS_PLACEHOLDER = "\0"
+MINIFIABLE_EXTENSIONS = (".css",)
+
+
+def is_block_token(token: str) -> bool:
+    """Tell whether whitespace next to a tag can be dropped without changing the page.
+
+    Args:
+        token: A tag, comment or raw element, or None at the edge of the text
+
+    Returns:
+        True for doctypes and tags of block-level or invisible elements
+    """
+    if token is None:
+        return False
+    if token.startswith("<!"):
+        return not token.startswith("<!--")
+    match = TAG_NAME_PATTERN.match(token)
+    return match is not None and match.group(1).lower() in BLOCK_ELEMENTS
+
+
+def minify_html(html: str) -> str:
+    """Collapse the whitespace and drop the comments of HTML text.
+
+    Runs of whitespace become a single space and are dropped entirely next to
+    block-level tags. Contents of pre, textarea, script and style elements and
+    conditional comments are kept as they are. Whitespace at the edges of the
+    text is only collapsed, since the text may be a template segment that is
+    joined to page content.
+
+    Args:
+        html: The HTML text to minify
+
+    Returns:
+        The minified HTML text
+    """
+    tokens = HTML_TOKEN_PATTERN.split(html)
+    # split() also returns the raw element's name group; fold it away
+    del tokens[2::3]
+    # Join the text on both sides of a dropped comment, so its whitespace collapses as one run
+    kept = [tokens[0]]
+    for i in range(1, len(tokens), 2):
+        if tokens[i].startswith("<!--") and not tokens[i].startswith("<!--[if"):
+            kept[-1] += tokens[i + 1]
+        else:
+            kept.extend(tokens[i : i + 2])
+    tokens = kept
+    for i in range(0, len(tokens), 2):
+        text = WHITESPACE_PATTERN.sub(" ", tokens[i])
+        if is_block_token(tokens[i - 1] if i > 0 else None):
+            text = text.lstrip(" ")
+        if is_block_token(tokens[i + 1] if i + 1 < len(tokens) else None):
+            text = text.rstrip(" ")
+        tokens[i] = text
+    return "".join(tokens)
+
+
+def minify_css(css: str) -> str:
+    """Drop the comments and redundant whitespace of a stylesheet.
+
+    Strings are kept as they are, as are comments starting with '/*!', which
+    by convention hold license text.
+
+    Args:
+        css: The stylesheet text
+
+    Returns:
+        The minified stylesheet text
+    """
+    # The code with a placeholder for every kept token (strings, license comments), so
+    # the passes below see each declaration whole, even when a string sits inside it
+    code = []
+    kept = []
+    for i, token in enumerate(CSS_TOKEN_PATTERN.split(css)):
+        if i % 2 == 0:
+            code.append(token)
+        elif token.startswith("/*") and not token.startswith("/*!"):
+            code.append(" ")
+        else:
+            code.append(CSS_PLACEHOLDER)
+            kept.append(token)
+    code = WHITESPACE_PATTERN.sub(" ", "".join(code))
+    code = CSS_PUNCTUATION_PATTERN.sub(r"\1", code)
+    code = CSS_DECLARATION_PATTERN.sub(r"\1:", code)
+    code = code.replace(": ", ":").replace(";}", "}").split(CSS_PLACEHOLDER)
+    chunks = [code[0]]
+    for token, text in zip(kept, code[1:]):
+        chunks.extend([token, text])
+    return "".join(chunks).strip()
+
+
+def is_minifiable(path: str) -> bool:
+    """Tell whether a static file is minified while it is copied.
+
+    Args:
+        path: The path of the file
+
+    Returns:
+        True if the file is a stylesheet
+    """
+    return path.endswith(MINIFIABLE_EXTENSIONS)
+
+
+class MinifyCache:
+    """Minified stylesheets keyed by the content hash of the original file."""
+
+    def __init__(self, entries: dict = None) -> None:
+        """Initialize a cache with previously minified outputs.
+
+        Args:
+            entries: A dictionary mapping content hashes to minified text
+        """
+        self.entries = entries if entries is not None else {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "MinifyCache":
+        """Load a cache from disk, returning an empty one if it is missing or unreadable.
+
+        Args:
+            path: The path to the cache JSON file
+
+        Returns:
+            The loaded MinifyCache
+        """
+        return cls(load_json_state(path, "entries"))
+
+    def save(self, path: str, prune: bool = False) -> None:
+        """Write the cache to disk.
+
+        Args:
+            path: The path to the cache JSON file
+            prune: Keep only the entries used since the cache was loaded, e.g. after
+                a full build that copied every file
+        """
+        save_json_state(path, {"entries": self.used if prune else self.entries})
+
+    def minify(self, data: bytes) -> bytes:
+        """Return the minified form of a stylesheet, minifying it only once per content.
+
+        Args:
+            data: The contents of the original file
+
+        Returns:
+            The minified contents
+        """
+        key = hash_bytes(data)
+        with self._lock:
+            text = self.entries.get(key)
+            if text is not None:
+                self.hits += 1
+                self.used[key] = text
+                return text.encode()
+        text = minify_css(data.decode())
+        with self._lock:
+            self.misses += 1
+            self.entries[key] = self.used[key] = text
+        return text.encode()
+
+
+def minify_file(source_file: str, destination_file: str, cache: MinifyCache) -> bool:
+    """Write the minified copy of a file unless the destination already holds it.
+
+    Args:
+        source_file: The path to the source file
+        destination_file: The path to the minified copy
+        cache: The cache of minified outputs
+
+    Returns:
+        True if the destination was written
+    """
+    with open(source_file, "rb") as f:
+        data = cache.minify(f.read())
+    try:
+        with open(destination_file, "rb") as f:
+            if f.read() == data:
+                return False
+        # A hardlinked copy shares its inode with the source; never write through it
+        os.unlink(destination_file)
+    except FileNotFoundError:
+        pass
+    with open(destination_file, "wb") as f:
+        f.write(data)
+    logger.debug(f"Minified {source_file} -> {destination_file} ({len(data)} bytes)")
+    return True
@@ -0,0 +1,107 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+_DONE = object()
+
+
+def worker_context():
+    """Return the multiprocessing context that worker pools are started with.
+
+    Worker pools are created while other threads run, such as the pipeline's
+    reader and writer or the static file copier, and a forked child inherits
+    whatever locks those threads held. Workers are therefore forked from a
+    single-threaded forkserver process where the platform has one, and spawned
+    otherwise.
+
+    Returns:
+        A multiprocessing context to pass to ProcessPoolExecutor
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def run_pipeline(
+    items: list,
+    read,
+    render,
+    write,
+    jobs: int = None,
+    queue_size: int = 32,
+    initializer=None,
+    initargs: tuple = (),
+) -> list[tuple[object, Exception]]:
+    """Run every item through read, render and write stages that overlap in time.
+
+    A reader thread runs read(item) and feeds a bounded queue. The main thread
+    submits render(data) to a process pool. A writer thread waits on the results
+    in submission order and runs write(item, result). The queues bound the
+    number of items held in memory, so a slow stage applies back-pressure to
+    the stages before it instead of letting work pile up.
+
+    Args:
+        items: The work items, e.g. (source path, destination path) pairs
+        read: A callable returning the data render needs for an item (runs in a thread)
+        render: A picklable module-level callable run in a worker process
+        write: A callable storing an item's render result (runs in a thread)
+        jobs: Number of render processes; None uses every CPU
+        queue_size: Maximum number of items waiting between two stages (default: 32)
+        initializer: Optional callable run once in every worker process
+        initargs: Arguments for the initializer
+
+    Returns:
+        A list of (item, exception) pairs for the items that failed in any stage
+    """
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    failures = []
+    failures_lock = threading.Lock()
+
+    def fail(item, error):
+        with failures_lock:
+            failures.append((item, error))
+
+    def reader():
+        for item in items:
+            try:
+                data = read(item)
+            except Exception as e:
+                fail(item, e)
+                continue
+            read_queue.put((item, data))
+        read_queue.put(_DONE)
+
+    def writer():
+        while True:
+            entry = write_queue.get()
+            if entry is _DONE:
+                return
+            item, future = entry
+            try:
+                write(item, future.result())
+            except Exception as e:
+                fail(item, e)
+
+    reader_thread = threading.Thread(target=reader, daemon=True)
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    reader_thread.start()
+    writer_thread.start()
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=worker_context(),
+        initializer=initializer,
+        initargs=initargs,
+    ) as executor:
+        while True:
+            entry = read_queue.get()
+            if entry is _DONE:
+                break
+            item, data = entry
+            write_queue.put((item, executor.submit(render, data)))
+        write_queue.put(_DONE)
+        writer_thread.join()
+    reader_thread.join()
+    return failures
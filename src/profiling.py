@@ -0,0 +1,187 @@
+import json
+import time
+from contextlib import nullcontext
+
+
+class BuildProfiler:
+    """Accumulates wall-clock time per build stage and per page."""
+
+    def __init__(self) -> None:
+        """Initialize an empty profile and start its wall clock."""
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.pages = {}
+        self._stack = []
+
+    def stage(self, name: str) -> "StageTimer":
+        """Return a context manager that charges the time spent inside it to a stage.
+
+        Time spent in a nested stage is charged to the nested stage only.
+
+        Args:
+            name: The stage name, e.g. 'read' or 'inline'
+
+        Returns:
+            A context manager timing the stage
+        """
+        return StageTimer(self, name)
+
+    def add_page(self, path: str, seconds: float) -> None:
+        """Record how long a page took to build.
+
+        Args:
+            path: The source path of the page
+            seconds: The time spent building the page
+        """
+        self.pages[str(path)] = seconds
+
+    def snapshot(self) -> dict:
+        """Return the stage and page timings as plain data.
+
+        Returns:
+            A dictionary with 'stages' and 'pages' timings in seconds
+        """
+        return {"stages": dict(self.stages), "pages": dict(self.pages)}
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the timings of another profile, e.g. one taken in a worker process.
+
+        Args:
+            snapshot: A dictionary returned by snapshot()
+        """
+        for name, seconds in snapshot["stages"].items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.pages.update(snapshot["pages"])
+
+    def to_dict(self, slowest: int = 10) -> dict:
+        """Summarize the profile.
+
+        Args:
+            slowest: The number of slowest pages to include (default: 10)
+
+        Returns:
+            A dictionary with total time, pages per second, stage totals and the slowest pages
+        """
+        elapsed = time.perf_counter() - self.started
+        pages = sorted(self.pages.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "total_s": elapsed,
+            "pages": len(self.pages),
+            "pages_per_s": len(self.pages) / elapsed if elapsed > 0 else 0.0,
+            "stages": dict(sorted(self.stages.items(), key=lambda item: item[1], reverse=True)),
+            "slowest_pages": [{"path": path, "seconds": seconds} for path, seconds in pages[:slowest]],
+        }
+
+    def report(self, slowest: int = 10) -> str:
+        """Format the profile summary for the terminal.
+
+        Args:
+            slowest: The number of slowest pages to list (default: 10)
+
+        Returns:
+            A multi-line summary
+        """
+        summary = self.to_dict(slowest)
+        staged = sum(summary["stages"].values())
+        lines = [
+            f"Built {summary['pages']} pages in {summary['total_s']:.3f}s"
+            f" ({summary['pages_per_s']:.1f} pages/s)",
+            "",
+            f"{'stage':<10} {'seconds':>10} {'share':>7}",
+        ]
+        for name, seconds in summary["stages"].items():
+            share = seconds / staged * 100 if staged > 0 else 0.0
+            lines.append(f"{name:<10} {seconds:>10.4f} {share:>6.1f}%")
+        if summary["slowest_pages"]:
+            lines.append("")
+            lines.append(f"Slowest {len(summary['slowest_pages'])} pages:")
+            for page in summary["slowest_pages"]:
+                lines.append(f"  {page['seconds']:.4f}s  {page['path']}")
+        return "\n".join(lines)
+
+    def save(self, path: str, slowest: int = 10) -> None:
+        """Write the profile summary as JSON.
+
+        Args:
+            path: The path of the JSON file
+            slowest: The number of slowest pages to include (default: 10)
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(slowest), f, indent=2)
+
+
+class StageTimer:
+    """Context manager charging its self time to one stage of a BuildProfiler."""
+
+    __slots__ = ("profiler", "name", "start", "nested")
+
+    def __init__(self, profiler: BuildProfiler, name: str) -> None:
+        """Initialize a timer for a stage.
+
+        Args:
+            profiler: The profiler to charge the time to
+            name: The stage name
+        """
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "StageTimer":
+        """Start timing the stage.
+
+        Returns:
+            The timer itself
+        """
+        self.nested = 0.0
+        self.profiler._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop timing and charge the stage with its time minus nested stages."""
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        stages = self.profiler.stages
+        stages[self.name] = stages.get(self.name, 0.0) + elapsed - self.nested
+
+
+_profiler = None
+_disabled = nullcontext()
+
+
+def enable_profiling() -> BuildProfiler:
+    """Start collecting build timings in this process.
+
+    Returns:
+        The new active BuildProfiler
+    """
+    global _profiler
+    _profiler = BuildProfiler()
+    return _profiler
+
+
+def disable_profiling() -> None:
+    """Stop collecting build timings in this process."""
+    global _profiler
+    _profiler = None
+
+
+def get_profiler() -> BuildProfiler:
+    """Return the active profiler, or None when profiling is off."""
+    return _profiler
+
+
+def profile_stage(name: str):
+    """Return a context manager timing a stage, or a no-op one when profiling is off.
+
+    Args:
+        name: The stage name
+
+    Returns:
+        A context manager
+    """
+    if _profiler is None:
+        return _disabled
+    return _profiler.stage(name)
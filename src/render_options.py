@@ -0,0 +1,82 @@
+import hashlib
+
+
+class RenderOptions:
+    """Settings applied while markdown is rendered into HTML nodes."""
+
+    def __init__(
+        self,
+        basepath: str = "/",
+        asset_map: dict = None,
+        minify: bool = False,
+        image_sizes: dict = None,
+    ) -> None:
+        """Initialize the render settings of a build.
+
+        Args:
+            basepath: Base path that root-relative link and image URLs are rebased onto
+            asset_map: Optional mapping of root-relative asset URLs to their fingerprinted URLs
+            minify: Whether whitespace and comments are stripped from the page template
+            image_sizes: Optional mapping of root-relative image URLs to (width, height);
+                when given, every image is also marked for lazy loading
+        """
+        self.basepath = basepath
+        self.asset_map = asset_map or {}
+        self.minify = minify
+        self.image_sizes = image_sizes
+        self._key = basepath
+        if self.asset_map:
+            digest = hashlib.blake2b(digest_size=8)
+            for url, fingerprinted in sorted(self.asset_map.items()):
+                digest.update(f"{url}\0{fingerprinted}\0".encode())
+            self._key = f"{basepath}\0{digest.hexdigest()}"
+        if minify:
+            self._key += "\0minify"
+        if image_sizes is not None:
+            digest = hashlib.blake2b(digest_size=8)
+            for url, (width, height) in sorted(image_sizes.items()):
+                digest.update(f"{url}\0{width}\0{height}\0".encode())
+            self._key += f"\0images\0{digest.hexdigest()}"
+
+    def rewrite_url(self, url: str) -> str:
+        """Point a URL at its fingerprinted asset, then rebase it onto the basepath.
+
+        Args:
+            url: The URL of a link or image as written in the markdown
+
+        Returns:
+            The URL to put in the rendered HTML
+        """
+        url = self.asset_map.get(url, url)
+        if self.basepath != "/" and url.startswith("/"):
+            return self.basepath + url[1:]
+        return url
+
+    def image_attributes(self, url: str) -> dict[str, str]:
+        """Return the extra attributes of an image, by its URL as written in the markdown.
+
+        Args:
+            url: The image URL before rewriting
+
+        Returns:
+            width and height if the image's dimensions are known, and lazy loading
+            attributes, or an empty dictionary when image attributes are off
+        """
+        if self.image_sizes is None:
+            return {}
+        attributes = {}
+        size = self.image_sizes.get(url)
+        if size is not None:
+            attributes["width"] = str(size[0])
+            attributes["height"] = str(size[1])
+        attributes["loading"] = "lazy"
+        attributes["decoding"] = "async"
+        return attributes
+
+    def cache_key(self) -> str:
+        """Return a string identifying every setting that changes rendered HTML.
+
+        Returns:
+            A key to combine with block contents in render caches
+        """
+        return self._key
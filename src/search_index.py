@@ -0,0 +1,367 @@
+import json
+import logging
+import os
+import re
+import string
+from collections import Counter
+from src.inline_markdown import text_to_textnodes
+from src.manifest import hash_file
+from src.markdown_blocks import BlockType, Document, parse_document
+
+
+logger = logging.getLogger(__name__)
+
+# Directory under the output directory that holds the index
+SEARCH_DIR = "search"
+INDEX_VERSION = 1
+TERM_PATTERN = re.compile(r"[^\W_]+")
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+SHARD_PREFIXES = set(string.ascii_lowercase + string.digits)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search terms.
+
+    Args:
+        text: The visible text to tokenize
+
+    Returns:
+        The terms, in order, including repeats
+    """
+    return [
+        term
+        for term in TERM_PATTERN.findall(text.lower())
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def block_terms(block: str, block_type: BlockType, lines: list[str] = None) -> Counter:
+    """Count the terms of a parsed block's visible text.
+
+    Inline markdown is parsed into TextNodes so that only the text readers see is
+    indexed: link and image URLs are left out, link text and alt text are kept.
+
+    Args:
+        block: The markdown text of the block
+        block_type: The block's type
+        lines: The block's lines, if already split
+
+    Returns:
+        A Counter of term frequencies
+    """
+    if lines is None:
+        lines = block.split("\n")
+    if block_type == BlockType.CODE:
+        return Counter(tokenize("\n".join(lines[1:-1])))
+    if block_type == BlockType.HEADING:
+        texts = [block.lstrip("#")]
+    elif block_type in (BlockType.ULIST, BlockType.OLIST):
+        texts = [line.split(" ", 1)[1] if " " in line else "" for line in lines]
+    elif block_type == BlockType.QUOTE:
+        texts = [" ".join(line.lstrip(">").strip() for line in lines)]
+    else:
+        texts = [" ".join(lines)]
+    terms = Counter()
+    for text in texts:
+        for node in text_to_textnodes(text):
+            terms.update(tokenize(node.text))
+    return terms
+
+
+def document_terms(document: Document) -> Counter:
+    """Count the terms of every block of a parsed document.
+
+    Args:
+        document: The parsed markdown Document
+
+    Returns:
+        A Counter of term frequencies
+    """
+    terms = Counter()
+    for block, block_type, lines in zip(
+        document.blocks, document.block_types, document.block_lines
+    ):
+        terms.update(block_terms(block, block_type, lines))
+    return terms
+
+
+class SearchIndexer:
+    """Collects the title and terms of every page rendered in this process."""
+
+    def __init__(self) -> None:
+        """Initialize an indexer with no pages."""
+        self.pages = {}
+
+    def add_terms(self, source_path: str, title: str, terms: Counter) -> None:
+        """Record a rendered page's title and term frequencies.
+
+        Args:
+            source_path: The source path of the page
+            title: The page title
+            terms: The page's term frequencies
+        """
+        self.pages[str(source_path)] = {"title": title, "terms": dict(terms)}
+
+    def add_document(self, source_path: str, title: str, document: Document) -> None:
+        """Record a rendered page from its already parsed document.
+
+        Args:
+            source_path: The source path of the page
+            title: The page title
+            document: The page's parsed markdown Document
+        """
+        self.add_terms(source_path, title, document_terms(document))
+
+    def snapshot(self) -> dict:
+        """Return the recorded pages as plain data.
+
+        Returns:
+            A dictionary mapping source paths to {title, terms} entries
+        """
+        return dict(self.pages)
+
+    def merge(self, snapshot: dict) -> None:
+        """Add the pages recorded by another indexer, e.g. one in a worker process.
+
+        Args:
+            snapshot: A dictionary returned by snapshot()
+        """
+        self.pages.update(snapshot)
+
+
+_indexer = None
+
+
+def enable_indexing() -> SearchIndexer:
+    """Start collecting page terms in this process.
+
+    Returns:
+        The new active SearchIndexer
+    """
+    global _indexer
+    _indexer = SearchIndexer()
+    return _indexer
+
+
+def disable_indexing() -> None:
+    """Stop collecting page terms in this process."""
+    global _indexer
+    _indexer = None
+
+
+def get_indexer() -> SearchIndexer:
+    """Return the active indexer, or None when indexing is off."""
+    return _indexer
+
+
+def index_document(source_path: str, title: str, document: Document) -> None:
+    """Record a rendered page with the active indexer, if indexing is on.
+
+    Args:
+        source_path: The source path of the page
+        title: The page title
+        document: The page's parsed markdown Document
+    """
+    if _indexer is not None:
+        _indexer.add_document(source_path, title, document)
+
+
+def page_url(dest_path: str, dest_dir_path: str, basepath: str = "/") -> str:
+    """Return the URL a generated page is served at.
+
+    Args:
+        dest_path: Path of the page's HTML file
+        dest_dir_path: Path to the destination directory
+        basepath: Base path for URLs (default: "/")
+
+    Returns:
+        The page URL, with index.html reduced to its directory
+    """
+    rel_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if rel_path == "index.html":
+        rel_path = ""
+    elif rel_path.endswith("/index.html"):
+        rel_path = rel_path[: -len("index.html")]
+    return basepath + rel_path
+
+
+def is_index_file(rel_path: str) -> bool:
+    """Tell whether a destination file belongs to the search index.
+
+    Args:
+        rel_path: The path of the file relative to the destination directory
+
+    Returns:
+        True if the file is inside the index directory
+    """
+    return rel_path.startswith(SEARCH_DIR + os.sep)
+
+
+def shard_prefix(term: str) -> str:
+    """Return the name of the shard a term is stored in.
+
+    Args:
+        term: A search term
+
+    Returns:
+        The term's first character if it is an ASCII letter or digit, else '_'
+    """
+    return term[0] if term[0] in SHARD_PREFIXES else "_"
+
+
+def encode_index(pages: dict[str, dict]) -> tuple[dict, dict[str, dict]]:
+    """Encode pages into the page table and the sharded term dictionaries.
+
+    Pages are numbered in URL order. Every shard holds its terms sorted and, per
+    term, a flat postings list of (page number gap, term frequency) pairs, where
+    each gap is the difference from the previous page number of that term.
+
+    Args:
+        pages: A dictionary mapping page URLs to {title, hash, terms} entries
+
+    Returns:
+        A tuple of the page table and a dictionary mapping shard names to shards
+    """
+    urls = sorted(pages)
+    postings = {}
+    for page_id, url in enumerate(urls):
+        for term, frequency in pages[url]["terms"].items():
+            postings.setdefault(term, []).append((page_id, frequency))
+    shards = {}
+    for term in sorted(postings):
+        shard = shards.setdefault(shard_prefix(term), {"terms": [], "postings": []})
+        encoded = []
+        previous = 0
+        for page_id, frequency in postings[term]:
+            encoded.extend((page_id - previous, frequency))
+            previous = page_id
+        shard["terms"].append(term)
+        shard["postings"].append(encoded)
+    table = {
+        "version": INDEX_VERSION,
+        "shards": sorted(shards),
+        "pages": [[url, pages[url]["title"], pages[url]["hash"]] for url in urls],
+    }
+    return table, shards
+
+
+def load_search_index(index_dir: str) -> dict[str, dict]:
+    """Decode a previously written index back into per-page entries.
+
+    Args:
+        index_dir: The directory holding the index
+
+    Returns:
+        A dictionary mapping page URLs to {title, hash, terms} entries, empty if
+        the index is missing, unreadable or of another version
+    """
+    try:
+        with open(os.path.join(index_dir, "pages.json"), "r") as f:
+            table = json.load(f)
+        if table.get("version") != INDEX_VERSION:
+            return {}
+        pages = [
+            {"url": url, "title": title, "hash": source_hash, "terms": {}}
+            for url, title, source_hash in table["pages"]
+        ]
+        for name in table["shards"]:
+            with open(os.path.join(index_dir, f"{name}.json"), "r") as f:
+                shard = json.load(f)
+            for term, encoded in zip(shard["terms"], shard["postings"]):
+                page_id = 0
+                for i in range(0, len(encoded), 2):
+                    page_id += encoded[i]
+                    pages[page_id]["terms"][term] = encoded[i + 1]
+    except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError):
+        return {}
+    return {page.pop("url"): page for page in pages}
+
+
+def write_json_if_changed(path: str, data) -> bool:
+    """Write compact JSON unless the file already holds exactly that text.
+
+    Args:
+        path: The path of the JSON file
+        data: The data to write
+
+    Returns:
+        True if the file was written
+    """
+    text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    try:
+        with open(path, "r") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, "w") as f:
+        f.write(text)
+    return True
+
+
+def write_search_index(index_dir: str, pages: dict[str, dict]) -> int:
+    """Write the page table and shards, removing shards that are no longer used.
+
+    Args:
+        index_dir: The directory to hold the index
+        pages: A dictionary mapping page URLs to {title, hash, terms} entries
+
+    Returns:
+        The number of files written; unchanged files are left alone
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    table, shards = encode_index(pages)
+    written = 0
+    for name, shard in shards.items():
+        written += write_json_if_changed(os.path.join(index_dir, f"{name}.json"), shard)
+    written += write_json_if_changed(os.path.join(index_dir, "pages.json"), table)
+    for fname in os.listdir(index_dir):
+        name, ext = os.path.splitext(fname)
+        if ext == ".json" and name != "pages" and name not in shards:
+            os.remove(os.path.join(index_dir, fname))
+    return written
+
+
+def build_search_index(
+    pages: list[tuple[str, str]],
+    dest_dir_path: str,
+    basepath: str = "/",
+    indexer: SearchIndexer = None,
+) -> tuple[int, int]:
+    """Write the search index of every page of the site.
+
+    Pages rendered during this build come from the indexer. Other pages whose
+    source is unchanged are merged from the previous index without being
+    tokenized again; any remaining page is parsed and tokenized here.
+
+    Args:
+        pages: A list of (source path, destination path) pairs of every page
+        dest_dir_path: Path to the destination directory
+        basepath: Base path for URLs (default: "/")
+        indexer: The indexer that collected the pages rendered in this build
+
+    Returns:
+        A tuple with the number of pages indexed and the number merged from the previous index
+    """
+    index_dir = os.path.join(dest_dir_path, SEARCH_DIR)
+    previous = load_search_index(index_dir)
+    rendered = indexer.pages if indexer is not None else {}
+    entries = {}
+    reused = 0
+    for source_path, dest_path in pages:
+        url = page_url(dest_path, dest_dir_path, basepath)
+        source_hash = hash_file(source_path)[:16]
+        entry = rendered.get(str(source_path))
+        if entry is None:
+            entry = previous.get(url)
+            if entry is not None and entry["hash"] == source_hash:
+                reused += 1
+            else:
+                with open(source_path, "r") as md:
+                    document = parse_document(md.read())
+                entry = {"title": document.title or url, "terms": document_terms(document)}
+        entries[url] = {"title": entry["title"], "hash": source_hash, "terms": entry["terms"]}
+    written = write_search_index(index_dir, entries)
+    logger.debug(f"Indexed {len(entries)} pages ({reused} merged), wrote {written} index files")
+    return len(entries), reused
@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from src.copystatic import copy_file
+from src.manifest import BuildManifest
+from src.search_index import SEARCH_DIR, load_search_index, write_search_index
+
+
+logger = logging.getLogger(__name__)
+
+# Layout of a shard's directory: its output tree, its manifest and its shard spec
+SHARD_OUTPUT = "docs"
+SHARD_MANIFEST = "build_manifest.json"
+SHARD_INFO = "shard.json"
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parse a shard spec of the form 'i/N'.
+
+    Args:
+        text: The spec, e.g. '2/4' for the second of four shards
+
+    Returns:
+        A tuple with the 1-based shard index and the number of shards
+
+    Raises:
+        argparse.ArgumentTypeError: If the spec is malformed or the index is out of range
+    """
+    parts = text.split("/")
+    if len(parts) != 2:
+        raise argparse.ArgumentTypeError(f"expected I/N, e.g. 2/4, got {text!r}")
+    try:
+        index, count = int(parts[0]), int(parts[1])
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"shard index and count must be integers, got {text!r}"
+        ) from None
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"shard count must be at least 1, got {count}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f"shard index must be between 1 and {count}, got {index}"
+        )
+    return index, count
+
+
+def page_shard(source_path: str, dir_path_content: str, count: int) -> int:
+    """Return the shard a page belongs to.
+
+    The shard depends only on the page's path relative to the content directory,
+    so every machine assigns every page to the same shard.
+
+    Args:
+        source_path: Path to the source markdown file
+        dir_path_content: Path to the content directory
+        count: Number of shards
+
+    Returns:
+        The 1-based shard index
+    """
+    rel_path = os.path.relpath(source_path, dir_path_content).replace(os.sep, "/")
+    digest = hashlib.blake2b(rel_path.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def select_shard(
+    pages: list[tuple[str, str]], dir_path_content: str, shard: tuple[int, int]
+) -> list[tuple[str, str]]:
+    """Keep only the pages that belong to one shard.
+
+    Args:
+        pages: A list of (source path, destination path) pairs
+        dir_path_content: Path to the content directory
+        shard: A tuple with the 1-based shard index and the number of shards
+
+    Returns:
+        The pages of the shard, in their original order
+    """
+    index, count = shard
+    return [page for page in pages if page_shard(page[0], dir_path_content, count) == index]
+
+
+def save_shard_info(
+    shard_dir: str, shard: tuple[int, int], basepath: str = "/", options_key: str = None
+) -> None:
+    """Record which shard a shard directory holds, where its pages were written and
+    the settings they were rendered with.
+
+    The output path is kept because the manifest's page paths are relative to it,
+    while the merge step may find the shard directory somewhere else, e.g. after
+    it was downloaded from another machine.
+
+    Args:
+        shard_dir: The shard's directory
+        shard: A tuple with the 1-based shard index and the number of shards
+        basepath: Base path the shard's pages were built with
+        options_key: Cache key of the render options the pages were built with;
+            defaults to the basepath's
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    with open(os.path.join(shard_dir, SHARD_INFO), "w") as f:
+        json.dump(
+            {
+                "index": shard[0],
+                "count": shard[1],
+                "output": str(Path(shard_dir, SHARD_OUTPUT)),
+                "basepath": basepath,
+                "options": options_key if options_key is not None else basepath,
+            },
+            f,
+        )
+
+
+def find_shard_dirs(shards_root: str) -> list[str]:
+    """List the shard directories under a directory.
+
+    Args:
+        shards_root: The directory holding one directory per shard
+
+    Returns:
+        The paths of the subdirectories that hold a shard spec, sorted
+    """
+    if not os.path.isdir(shards_root):
+        return []
+    return [
+        os.path.join(shards_root, name)
+        for name in sorted(os.listdir(shards_root))
+        if os.path.isfile(os.path.join(shards_root, name, SHARD_INFO))
+    ]
+
+
+def merge_shards(
+    shard_dirs: list[str],
+    dest_dir_path: str,
+    manifest_path: str,
+    link: bool = False,
+    basepath: str = "/",
+    options_key: str = None,
+) -> int:
+    """Combine the pages, manifests and search indexes of every shard of a build.
+
+    Every shard's pages are copied into the destination directory, their manifest
+    entries are merged into one build manifest, and the shards' search indexes,
+    if any, are merged into one index. Every shard must have been built with the
+    basepath and render options of the merge, which renders the site's other files.
+
+    Args:
+        shard_dirs: The directories of the shards, one per shard of the build
+        dest_dir_path: Path to the destination directory
+        manifest_path: Path to write the merged build manifest to
+        link: Hardlink pages instead of copying them when possible
+        basepath: Base path of the merged site
+        options_key: Cache key of the merged site's render options; defaults to
+            the basepath's
+
+    Returns:
+        The number of pages merged
+
+    Raises:
+        ValueError: If shards are missing or duplicated, were built with
+            different settings, or built the same page
+    """
+    if not shard_dirs:
+        raise ValueError("No shards to merge")
+    infos = {}
+    for shard_dir in shard_dirs:
+        with open(os.path.join(shard_dir, SHARD_INFO), "r") as f:
+            infos[shard_dir] = json.load(f)
+    counts = {info["count"] for info in infos.values()}
+    if len(counts) != 1:
+        raise ValueError(f"Shards of builds with different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    indexes = sorted(info["index"] for info in infos.values())
+    if indexes != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1 to {count}, got {indexes}")
+    if options_key is None:
+        options_key = basepath
+    for shard_dir, info in infos.items():
+        if info.get("basepath") != basepath:
+            raise ValueError(
+                f"Shard {shard_dir} was built with basepath {info.get('basepath')!r},"
+                f" but the merge uses {basepath!r}"
+            )
+        if info.get("options") != options_key:
+            raise ValueError(
+                f"Shard {shard_dir} was built with different --fingerprint, --minify or"
+                " --lazy-images settings or static files than the merge"
+            )
+
+    merged = None
+    search_pages = {}
+    for shard_dir in shard_dirs:
+        shard_output = os.path.join(shard_dir, SHARD_OUTPUT)
+        manifest = BuildManifest.load(os.path.join(shard_dir, SHARD_MANIFEST))
+        if merged is None:
+            merged = BuildManifest(manifest.template_hash, manifest.basepath)
+        elif (manifest.template_hash, manifest.basepath) != (
+            merged.template_hash,
+            merged.basepath,
+        ):
+            raise ValueError(f"Shard {shard_dir} was built with different settings")
+        for source_path, entry in manifest.pages.items():
+            if source_path in merged.pages:
+                raise ValueError(f"Page {source_path} was built by more than one shard")
+            rel_path = os.path.relpath(entry["output_path"], infos[shard_dir]["output"])
+            dest_path = Path(dest_dir_path, rel_path)
+            os.makedirs(dest_path.parent, exist_ok=True)
+            copy_file(os.path.join(shard_output, rel_path), dest_path, link)
+            merged.pages[source_path] = dict(entry, output_path=str(dest_path))
+        search_pages.update(load_search_index(os.path.join(shard_output, SEARCH_DIR)))
+
+    merged.save(manifest_path)
+    if search_pages:
+        write_search_index(os.path.join(dest_dir_path, SEARCH_DIR), search_pages)
+    logger.debug(f"Merged {len(merged.pages)} pages from {len(shard_dirs)} shards")
+    return len(merged.pages)
@@ -0,0 +1,125 @@
+import re
+from src.htmlnode import HTMLNode
+from src.minify import minify_html
+from src.render_options import RenderOptions
+
+
+SLOT_PATTERN = re.compile(r"\{\{ (Title|Content) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def rebase_urls(html: str, basepath: str) -> str:
+    """Rewrite root-relative href and src attributes to start with the basepath.
+
+    Args:
+        html: The HTML text to rewrite
+        basepath: Base path for URLs in the HTML
+
+    Returns:
+        The rewritten HTML text
+    """
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+
+def rewrite_urls(html: str, options: RenderOptions) -> str:
+    """Rewrite every href and src attribute with the render settings' URL rewriting.
+
+    Args:
+        html: The HTML text to rewrite
+        options: The render settings, e.g. basepath and fingerprinted asset URLs
+
+    Returns:
+        The rewritten HTML text
+    """
+    return URL_ATTRIBUTE_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{options.rewrite_url(match.group(2))}"', html
+    )
+
+
+class Template:
+    """A page template pre-split into literal segments and named slots."""
+
+    def __init__(
+        self, text: str, basepath: str = "/", options: RenderOptions = None
+    ) -> None:
+        """Compile template text into segments and slots.
+
+        URLs in the template itself are rewritten here, once, and the segments are
+        minified if the settings ask for it. Page content is expected to be
+        rendered with the same settings already applied.
+
+        Args:
+            text: The template text containing '{{ Title }}' and '{{ Content }}' slots
+            basepath: Base path for URLs in the HTML (default: "/")
+            options: Render settings to rewrite URLs with instead of only rebasing them
+        """
+        self.basepath = basepath
+        self.segments = []
+        self.slots = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.segments.append(self._rewrite(text[position : match.start()], options))
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.segments.append(self._rewrite(text[position:], options))
+
+    def _rewrite(self, html: str, options: RenderOptions) -> str:
+        """Rewrite a literal segment's URLs with the render settings, or only rebase them."""
+        if options is None:
+            return rebase_urls(html, self.basepath)
+        html = rewrite_urls(html, options)
+        return minify_html(html) if options.minify else html
+
+    @classmethod
+    def from_file(
+        cls, template_path: str, basepath: str = "/", options: RenderOptions = None
+    ) -> "Template":
+        """Read and compile a template file.
+
+        Args:
+            template_path: Path to the HTML template file
+            basepath: Base path for URLs in the HTML (default: "/")
+            options: Render settings to rewrite URLs with instead of only rebasing them
+
+        Returns:
+            The compiled Template
+        """
+        with open(template_path, "r") as template:
+            return cls(template.read(), basepath, options)
+
+    def render(self, title: str, content: str) -> str:
+        """Fill the template's slots with a page's title and content.
+
+        Args:
+            title: The page title
+            content: The rendered HTML content of the page
+
+        Returns:
+            The complete HTML page
+        """
+        values = {"Title": title, "Content": content}
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values[slot])
+            parts.append(segment)
+        return "".join(parts)
+
+    def write(self, fp, title: str, content: HTMLNode) -> None:
+        """Stream a page to a file-like object, serializing the content node in place.
+
+        Args:
+            fp: A writable text file-like object
+            title: The page title
+            content: The root node of the page's rendered content, or any object
+                with a write_html(fp) method such as a BlockStream
+        """
+        fp.write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            if slot == "Title":
+                fp.write(title)
+            else:
+                content.write_html(fp)
+            fp.write(segment)
@@ -1,5 +1,6 @@
 from enum import Enum
 from src.htmlnode import LeafNode
+from src.render_options import RenderOptions
 
 
 class TextType(Enum):
@@ -14,6 +15,8 @@ class TextType(Enum):
 class TextNode:
     """A node representing text with specific formatting type."""
     
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None) -> None:
         """Initialize a text node with text, type, and optional URL.
         
@@ -54,11 +57,13 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+def text_node_to_html_node(text_node: TextNode, options: RenderOptions = None) -> LeafNode:
     """Convert a TextNode to an HTML LeafNode.
     
     Args:
         text_node: A TextNode to convert
+        options: Optional render settings; link and image URLs are rebased with them
+            and images get the settings' extra attributes
         
     Returns:
         A LeafNode with appropriate HTML tag and attributes
@@ -75,8 +80,13 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if options is None else options.rewrite_url(text_node.url)
+        return LeafNode("a", text_node.text, {"href": url})
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        if options is None:
+            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        attributes = {"src": options.rewrite_url(text_node.url), "alt": text_node.text}
+        attributes.update(options.image_attributes(text_node.url))
+        return LeafNode("img", "", attributes)
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
@@ -0,0 +1,187 @@
+import logging
+import os
+import time
+from src.copystatic import is_generated_file, sync_tree
+from src.log import flush_logs
+from src.generate_content import generate_pages_recursive, page_destination, render_page
+from src.manifest import BuildManifest, hash_file
+from src.render_options import RenderOptions
+from src.template import Template
+
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_files(root: str) -> dict[str, tuple[int, int]]:
+    """Function that records the modification time and size of every file under a path.
+
+    Args:
+        root: A directory to walk, or a single file
+
+    Returns:
+        A dictionary mapping file paths to (mtime in ns, size) pairs
+    """
+    if os.path.isfile(root):
+        paths = [root]
+    else:
+        paths = [
+            os.path.join(dirpath, fname)
+            for dirpath, dirnames, filenames in os.walk(root)
+            for fname in filenames
+        ]
+    files = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteWatcher:
+    """Polls the content, static and template inputs and rebuilds only what changed."""
+
+    def __init__(
+        self,
+        dir_path_content: str,
+        dir_path_static: str,
+        template_path: str,
+        dest_dir_path: str,
+        basepath: str = "/",
+        manifest_path: str = "./.build_manifest.json",
+        keep=is_generated_file,
+    ) -> None:
+        """Initialize a watcher over the site's inputs.
+
+        Args:
+            dir_path_content: Path to the source directory containing markdown files
+            dir_path_static: Path to the directory of static assets
+            template_path: Path to the HTML template file
+            dest_dir_path: Path to the destination directory for generated HTML files
+            basepath: Base path for URLs in the HTML (default: "/")
+            manifest_path: Path to the manifest JSON file
+            keep: Predicate on destination-relative paths of files that syncing the
+                static files must never remove
+        """
+        self.dir_path_content = dir_path_content
+        self.dir_path_static = dir_path_static
+        self.template_path = template_path
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.keep = keep
+        self.manifest = BuildManifest.load(manifest_path)
+        self.content_files = {}
+        self.static_files = {}
+        self.template_files = {}
+
+    def build(self) -> None:
+        """Bring the whole site up to date and take the first snapshot of the inputs."""
+        self.template_files = snapshot_files(self.template_path)
+        self.static_files = snapshot_files(self.dir_path_static)
+        self.content_files = snapshot_files(self.dir_path_content)
+        sync_tree(self.dir_path_static, self.dest_dir_path, keep=self.keep)
+        self.rebuild_pages()
+
+    def rebuild_pages(self) -> None:
+        """Recompile the template and regenerate every page whose inputs changed."""
+        self.template = Template.from_file(self.template_path, self.basepath)
+        self.options = RenderOptions(self.basepath)
+        self.manifest.begin(hash_file(self.template_path), self.basepath)
+        try:
+            generate_pages_recursive(
+                self.dir_path_content,
+                self.template_path,
+                self.dest_dir_path,
+                self.basepath,
+                self.manifest,
+                options=self.options,
+            )
+        finally:
+            self.manifest.save(self.manifest_path)
+
+    def poll(self) -> bool:
+        """Check the inputs once and rebuild whatever changed since the last check.
+
+        Returns:
+            True if anything was rebuilt
+        """
+        template_files = snapshot_files(self.template_path)
+        static_files = snapshot_files(self.dir_path_static)
+        content_files = snapshot_files(self.dir_path_content)
+        template_changed = template_files != self.template_files
+        static_changed = static_files != self.static_files
+        changed_pages = [
+            path
+            for path, stat in sorted(content_files.items())
+            if self.content_files.get(path) != stat
+        ]
+        removed_pages = [path for path in self.content_files if path not in content_files]
+        self.template_files = template_files
+        self.static_files = static_files
+        self.content_files = content_files
+
+        if static_changed:
+            copied, removed = sync_tree(
+                self.dir_path_static, self.dest_dir_path, keep=self.keep
+            )
+            logger.info(f"Synced static files: {copied} copied, {removed} removed")
+        if template_changed:
+            logger.info("Template changed, re-rendering every page")
+            self.rebuild_pages()
+        elif changed_pages or removed_pages:
+            self.update_pages(changed_pages, removed_pages)
+        return static_changed or template_changed or bool(changed_pages or removed_pages)
+
+    def update_pages(self, changed_pages: list[str], removed_pages: list[str]) -> None:
+        """Regenerate changed pages and delete the output of removed ones.
+
+        Args:
+            changed_pages: Paths of new or modified markdown files
+            removed_pages: Paths of deleted markdown files
+        """
+        for source_path in changed_pages:
+            dest_path = page_destination(
+                source_path, self.dir_path_content, self.dest_dir_path
+            )
+            try:
+                render_page(
+                    source_path, self.template, dest_path, options=self.options
+                )
+            except Exception as e:
+                logger.error(f"Failed to build {source_path}: {e}")
+                continue
+            logger.info(f"Rebuilt {dest_path}")
+            self.manifest.record(source_path, hash_file(source_path), dest_path)
+        for source_path in removed_pages:
+            dest_path = page_destination(
+                source_path, self.dir_path_content, self.dest_dir_path
+            )
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+                logger.info(f"Removed {dest_path}")
+            self.manifest.forget(source_path)
+        self.manifest.save(self.manifest_path)
+
+    def run(self, interval: float = 0.05) -> None:
+        """Build the site, then keep polling for changes until interrupted.
+
+        Args:
+            interval: Seconds to wait between checks (default: 0.05)
+        """
+        self.build()
+        logger.info(
+            f"Watching {self.dir_path_content}, {self.dir_path_static} and {self.template_path}"
+        )
+        flush_logs()
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Build failed: {e}")
+                flush_logs()
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
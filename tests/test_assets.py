@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from src.assets import (
+    AssetManifest,
+    asset_urls,
+    fingerprinted_path,
+    publish_fingerprinted,
+)
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "assets.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body {}")
+        self.write("images/a.png", "png")
+        self.write("about.html", "<p>about</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.static, rel_path), "w") as f:
+            f.write(text)
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(
+            fingerprinted_path("images/a.png", "0123456789abcdef"), "images/a.0123456789.png"
+        )
+
+    def test_fingerprint_skips_html(self):
+        fingerprints = AssetManifest().fingerprint(self.static)
+        self.assertEqual(sorted(fingerprints), ["images/a.png", "index.css"])
+
+    def test_unchanged_assets_are_not_rehashed(self):
+        manifest = AssetManifest()
+        first = manifest.fingerprint(self.static)
+        manifest.save(self.manifest_path)
+        manifest = AssetManifest.load(self.manifest_path)
+        self.assertEqual(manifest.fingerprint(self.static), first)
+        self.assertEqual(manifest.hashed, 0)
+
+        self.write("index.css", "body { color: red }")
+        changed = manifest.fingerprint(self.static)
+        self.assertEqual(manifest.hashed, 1)
+        self.assertNotEqual(changed["index.css"], first["index.css"])
+        self.assertEqual(changed["images/a.png"], first["images/a.png"])
+
+    def test_publish_and_urls(self):
+        fingerprints = AssetManifest().fingerprint(self.static)
+        self.assertEqual(publish_fingerprinted(self.static, self.docs, fingerprints), 2)
+        self.assertEqual(publish_fingerprinted(self.static, self.docs, fingerprints), 0)
+        with open(os.path.join(self.docs, fingerprints["index.css"])) as f:
+            self.assertEqual(f.read(), "body {}")
+        urls = asset_urls(fingerprints)
+        self.assertEqual(urls["/index.css"], "/" + fingerprints["index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
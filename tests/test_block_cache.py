@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from src.block_cache import BlockCache
+from src.markdown_blocks import markdown_to_html_node
+from src.render_options import RenderOptions
+
+
+MARKDOWN = """
+# Title
+
+Shared **disclaimer** paragraph
+
+- item one
+- item two
+
+Shared **disclaimer** paragraph
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_render_counts_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertEqual(cache.render("Some _text_"), "<p>Some <i>text</i></p>")
+        self.assertEqual(cache.render("Some _text_"), "<p>Some <i>text</i></p>")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 1, "maxsize": 4096})
+
+    def test_least_recently_used_is_evicted(self):
+        cache = BlockCache(maxsize=2)
+        cache.render("a")
+        cache.render("b")
+        cache.render("a")
+        cache.render("c")
+        cache.render("a")
+        self.assertEqual(cache.hits, 2)
+        cache.render("b")
+        self.assertEqual(cache.misses, 4)
+
+    def test_cached_document_matches_uncached(self):
+        cache = BlockCache()
+        self.assertEqual(
+            markdown_to_html_node(MARKDOWN, cache).to_html(),
+            markdown_to_html_node(MARKDOWN).to_html(),
+        )
+        self.assertEqual(cache.hits, 1)
+
+    def test_basepath_is_part_of_the_key(self):
+        cache = BlockCache()
+        self.assertEqual(cache.render("[a](/b)"), '<p><a href="/b">a</a></p>')
+        self.assertEqual(
+            cache.render("[a](/b)", options=RenderOptions("/site/")),
+            '<p><a href="/site/b">a</a></p>',
+        )
+        self.assertEqual(cache.misses, 2)
+
+    def test_persisted_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = BlockCache()
+            cache.render("a")
+            cache.save(path)
+            loaded = BlockCache.load(path)
+            loaded.render("a")
+            self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+
+    def test_take_added_and_merge(self):
+        worker = BlockCache()
+        worker.render("a")
+        self.assertEqual(worker.take_added(), {})
+        worker.render("a")
+        worker.render("b")
+        added = worker.take_added()
+        self.assertEqual(list(added.values()), ["<p>b</p>"])
+        self.assertEqual(worker.take_added(), {})
+        parent = BlockCache(maxsize=1)
+        parent.render("c")
+        parent.merge(added)
+        self.assertEqual(list(parent.entries.values()), ["<p>b</p>"])
+
+    def test_load_missing_file(self):
+        self.assertEqual(BlockCache.load("/nonexistent/cache.json").stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
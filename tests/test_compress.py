@@ -0,0 +1,64 @@
+import gzip
+import os
+import tempfile
+import unittest
+from src.compress import CompressionManifest, compress_tree, gzip_bytes
+
+
+class TestCompressTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = self.tmp.name
+        os.makedirs(os.path.join(self.docs, "blog"))
+        self.write("index.html", "<p>hello</p>" * 200)
+        self.write("blog/index.css", "body { margin: 0 }\n" * 100)
+        self.write("small.html", "<p>hi</p>")
+        self.write("image.png", "png" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.docs, rel_path), "w") as f:
+            f.write(text)
+
+    def exists(self, rel_path):
+        return os.path.exists(os.path.join(self.docs, rel_path))
+
+    def test_gzip_is_reproducible(self):
+        self.assertEqual(gzip_bytes(b"abc" * 100), gzip_bytes(b"abc" * 100))
+
+    def test_compresses_large_text_files(self):
+        manifest = CompressionManifest()
+        self.assertEqual(compress_tree(self.docs, manifest), (2, 0))
+        with gzip.open(os.path.join(self.docs, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertTrue(self.exists("blog/index.css.gz"))
+        self.assertFalse(self.exists("small.html.gz"))
+        self.assertFalse(self.exists("image.png.gz"))
+        self.assertEqual(sorted(manifest.files), ["blog/index.css", "index.html"])
+
+    def test_unchanged_files_are_skipped(self):
+        manifest = CompressionManifest()
+        compress_tree(self.docs, manifest)
+        path = os.path.join(self.tmp.name, "compress.json")
+        manifest.save(path)
+        manifest = CompressionManifest.load(path)
+        self.write("index.html", "<p>hello</p>" * 200)
+        self.assertEqual(compress_tree(self.docs, manifest), (0, 2))
+        self.write("index.html", "<p>changed</p>" * 200)
+        self.assertEqual(compress_tree(self.docs, manifest), (1, 1))
+
+    def test_stale_variants_are_removed(self):
+        compress_tree(self.docs, CompressionManifest())
+        os.remove(os.path.join(self.docs, "index.html"))
+        self.write("blog/index.css", "tiny")
+        manifest = CompressionManifest()
+        compress_tree(self.docs, manifest)
+        self.assertFalse(self.exists("index.html.gz"))
+        self.assertFalse(self.exists("blog/index.css.gz"))
+        self.assertEqual(manifest.files, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
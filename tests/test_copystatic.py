@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from src.copystatic import copy_file, recursive_copy, sync_tree
+from src.minify import MinifyCache
+
+
+class TestSyncTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(self.static, "index.css", "body {}")
+        self.write(self.static, "images/a.png", "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, root, rel_path, text):
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def sync(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return sync_tree(self.static, self.docs, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0))
+        with open(os.path.join(self.docs, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_unchanged_files_are_not_copied(self):
+        self.sync()
+        self.assertEqual(self.sync(), (0, 0))
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(self.static, "index.css", "body { color: red }")
+        self.assertEqual(self.sync(), (1, 0))
+
+    def test_deleted_source_is_removed_and_html_is_kept(self):
+        self.sync()
+        self.write(self.docs, "index.html", "<html></html>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_checksum_skips_touched_file(self):
+        self.sync()
+        os.utime(os.path.join(self.static, "index.css"), ns=(0, 0))
+        self.assertEqual(self.sync(checksum=True), (0, 0))
+        self.assertEqual(self.sync(), (0, 0))
+
+    def test_minify_stylesheets(self):
+        cache = MinifyCache()
+        self.write(self.static, "index.css", "body {\n  color: red;\n}\n")
+        self.assertEqual(self.sync(minify_cache=cache), (2, 0))
+        with open(os.path.join(self.docs, "index.css")) as f:
+            self.assertEqual(f.read(), "body{color:red}")
+        self.assertEqual(self.sync(minify_cache=cache), (0, 0))
+        self.assertEqual(self.sync(), (1, 0))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+
+class TestRecursiveCopy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        for rel_path, data in [
+            ("index.css", b"body {}"),
+            ("index.html", b"<p>static</p>"),
+            ("images/a.png", b"\x89PNG" * 5000),
+            ("images/empty.txt", b""),
+        ]:
+            with open(os.path.join(self.static, rel_path), "wb") as f:
+                f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, root, rel_path):
+        with open(os.path.join(root, rel_path), "rb") as f:
+            return f.read()
+
+    def test_copies_every_file(self):
+        self.assertEqual(recursive_copy(self.static, self.docs, workers=2), 4)
+        for rel_path in ["index.css", "index.html", "images/a.png", "images/empty.txt"]:
+            self.assertEqual(self.read(self.docs, rel_path), self.read(self.static, rel_path))
+
+    def test_exclude_skips_generated_pages(self):
+        self.assertEqual(recursive_copy(self.static, self.docs, exclude={"index.html"}), 3)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_hardlink(self):
+        recursive_copy(self.static, self.docs, link=True)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.static, "index.css"), os.path.join(self.docs, "index.css")
+            )
+        )
+
+    def test_copy_replaces_hardlink_without_touching_source(self):
+        source = os.path.join(self.static, "index.css")
+        destination = os.path.join(self.docs, "index.css")
+        os.makedirs(self.docs)
+        self.assertTrue(copy_file(source, destination, link=True))
+        self.assertFalse(copy_file(os.path.join(self.static, "index.html"), destination))
+        self.assertEqual(self.read(self.static, "index.css"), b"body {}")
+        self.assertEqual(self.read(self.docs, "index.css"), b"<p>static</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,10 @@ class TestMarkdown(unittest.TestCase):
         header = extract_title(content)
         self.assertEqual(header, "Hello")
 
+    def test_markdown_extract_missing_header(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Not a title\n\nText")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+from src.generate_content import (
+    BuildError,
+    find_pages,
+    generate_pages_recursive,
+    render_page,
+    stream_page,
+    write_html_file,
+)
+from src.block_cache import BlockCache
+from src.template import Template
+
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.docs = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        self.write("index.md", "# Home\n\nHello")
+        self.write("blog/post/index.md", "# Post\n\nA **post**")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.content, rel_path), "w") as f:
+            f.write(text)
+
+    def read_output(self, rel_path):
+        with open(os.path.join(self.docs, rel_path)) as f:
+            return f.read()
+
+    def test_find_pages(self):
+        pages = find_pages(self.content, self.docs)
+        self.assertEqual(
+            [os.path.relpath(dest, self.docs) for _, dest in pages],
+            [os.path.join("blog", "post", "index.html"), "index.html"],
+        )
+
+    def test_parallel_matches_serial(self):
+        generate_pages_recursive(self.content, self.template, self.docs)
+        serial = self.read_output("blog/post/index.html")
+        generate_pages_recursive(self.content, self.template, self.docs, jobs=2)
+        self.assertEqual(self.read_output("blog/post/index.html"), serial)
+        self.assertEqual(
+            serial, "<title>Post</title><body><div><h1>Post</h1><p>A <b>post</b></p></div></body>"
+        )
+
+    def test_parallel_reports_every_failure(self):
+        self.write("broken.md", "no title")
+        self.write("also_broken.md", "**unclosed")
+        with self.assertRaises(BuildError) as cm:
+            generate_pages_recursive(self.content, self.template, self.docs, jobs=2)
+        failed = sorted(os.path.basename(path) for path, _ in cm.exception.failures)
+        self.assertEqual(failed, ["also_broken.md", "broken.md"])
+        self.assertIn("Home", self.read_output("index.html"))
+
+    def test_pipeline_matches_serial(self):
+        generate_pages_recursive(self.content, self.template, self.docs)
+        serial = self.read_output("blog/post/index.html")
+        count = generate_pages_recursive(
+            self.content, self.template, self.docs, jobs=2, pipeline=True
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(self.read_output("blog/post/index.html"), serial)
+
+    def test_pipeline_reports_every_failure(self):
+        self.write("broken.md", "no title")
+        self.write("also_broken.md", "**unclosed")
+        with self.assertRaises(BuildError) as cm:
+            generate_pages_recursive(
+                self.content, self.template, self.docs, jobs=2, pipeline=True
+            )
+        failed = [os.path.basename(path) for path, _ in cm.exception.failures]
+        self.assertEqual(failed, ["also_broken.md", "broken.md"])
+        self.assertIn("Home", self.read_output("index.html"))
+
+    def test_parallel_blocks_reach_the_cache(self):
+        for pipeline in (False, True):
+            cache = BlockCache()
+            generate_pages_recursive(
+                self.content, self.template, self.docs, jobs=2, cache=cache, pipeline=pipeline
+            )
+            self.assertEqual(cache.misses, 4)
+            self.assertIn("<p>A <b>post</b></p>", cache.entries.values())
+
+    def test_stream_matches_serial(self):
+        self.write("big.md", "Intro\n\n# Big\n\n" + "- [a](/a)\n- `b`\n\n" * 50)
+        generate_pages_recursive(self.content, self.template, self.docs)
+        serial = self.read_output("big.html")
+        generate_pages_recursive(self.content, self.template, self.docs, stream_min_size=100)
+        self.assertEqual(self.read_output("big.html"), serial)
+
+    def test_stream_without_title_leaves_no_output(self):
+        self.write("broken.md", "no title\n\nat all")
+        dest = os.path.join(self.docs, "broken.html")
+        with self.assertRaises(ValueError):
+            stream_page(os.path.join(self.content, "broken.md"), Template(TEMPLATE), dest)
+        self.assertFalse(os.path.exists(dest))
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+
+    def test_render_error_keeps_previous_output(self):
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.docs, "index.html")
+        render_page(source, Template(TEMPLATE), dest)
+        previous = self.read_output("index.html")
+        self.write("index.md", "# Home\n\n- a\n- \n- b")
+        with self.assertRaises(ValueError):
+            render_page(source, Template(TEMPLATE), dest)
+        self.assertEqual(self.read_output("index.html"), previous)
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+
+    def test_write_replaces_hardlinked_file(self):
+        dest = os.path.join(self.docs, "index.html")
+        linked = os.path.join(self.tmp.name, "linked.html")
+        write_html_file(dest, "old")
+        os.link(dest, linked)
+        write_html_file(dest, "new")
+        self.assertEqual(self.read_output("index.html"), "new")
+        with open(linked) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
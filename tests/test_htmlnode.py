@@ -1,3 +1,4 @@
+import io
 import unittest
 from src.htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -80,6 +81,20 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span><span2><b>grandchild</b></span2><b>grandchild</b></div>",
         )
 
+    def test_write_html(self):
+        node = ParentNode(
+            "div", [LeafNode("a", "link", {"href": "/x"}), ParentNode("p", [LeafNode(None, "text")])]
+        )
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(buffer.getvalue(), '<div><a href="/x">link</a><p>text</p></div>')
+
+    def test_write_html_no_children(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            node.write_html(io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import io
+import os
+import struct
+import tempfile
+import unittest
+from src.images import ImageManifest, image_size, jpeg_size
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII", 13, b"IHDR", width, height) + b"\0" * 40
+
+
+def jpeg(width, height):
+    app1 = b"\xff\xe1" + struct.pack(">H", 1002) + b"\0" * 1000
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\0" * 10
+    return b"\xff\xd8" + app1 + sof + b"\xff\xda" + b"\0" * 5000
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size_of(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return image_size(path)
+
+    def test_png(self):
+        self.assertEqual(self.size_of(png(1026, 388)), (1026, 388))
+
+    def test_gif(self):
+        gif = b"GIF89a" + struct.pack("<HH", 300, 20) + b"\0" * 8
+        self.assertEqual(self.size_of(gif), (300, 20))
+
+    def test_webp(self):
+        riff = b"RIFF" + struct.pack("<I", 100) + b"WEBP"
+        lossy = riff + b"VP8 " + b"\0" * 7 + b"\x9d\x01\x2a" + struct.pack("<HH", 640, 480)
+        bits = (640 - 1) | (480 - 1) << 14
+        lossless = riff + b"VP8L" + b"\0" * 4 + b"\x2f" + bits.to_bytes(4, "little") + b"\0" * 5
+        extended = riff + b"VP8X" + b"\0" * 8 + (1919).to_bytes(3, "little")
+        extended += (1079).to_bytes(3, "little")
+        self.assertEqual(self.size_of(lossy), (640, 480))
+        self.assertEqual(self.size_of(lossless), (640, 480))
+        self.assertEqual(self.size_of(extended), (1920, 1080))
+
+    def test_jpeg_skips_segments_without_reading_them(self):
+        self.assertEqual(self.size_of(jpeg(800, 600)), (800, 600))
+        reader = CountingReader(jpeg(800, 600))
+        self.assertEqual(jpeg_size(reader), (800, 600))
+        self.assertLess(reader.bytes_read, 20)
+
+    def test_unknown_or_damaged(self):
+        self.assertIsNone(self.size_of(b"not an image"))
+        self.assertIsNone(self.size_of(b"\xff\xd8\xff\xda" + b"\0" * 10))
+        self.assertIsNone(self.size_of(png(1, 1)[:20]))
+
+
+class TestImageManifest(unittest.TestCase):
+    def test_dimensions_reuse_unchanged_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "images"))
+            with open(os.path.join(tmp, "images", "a.png"), "wb") as f:
+                f.write(png(10, 20))
+            with open(os.path.join(tmp, "index.css"), "w") as f:
+                f.write("body {}")
+            manifest = ImageManifest()
+            self.assertEqual(manifest.dimensions(tmp), {"/images/a.png": (10, 20)})
+            self.assertEqual(manifest.read, 1)
+            manifest.images["images/a.png"]["width"] = 99
+            self.assertEqual(manifest.dimensions(tmp), {"/images/a.png": (99, 20)})
+            self.assertEqual(manifest.read, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
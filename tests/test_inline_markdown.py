@@ -268,6 +268,35 @@ class TestInLineMarkdown(unittest.TestCase):
             ],
         )
 
+    def test_text_to_textnodes_literal_delimiters(self):
+        new_nodes = text_to_textnodes("`a_b**c` and _x**y_")
+        self.assertListEqual(
+            new_nodes,
+            [
+                TextNode("a_b**c", TextType.CODE),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("x**y", TextType.ITALIC),
+            ],
+        )
+
+    def test_text_to_textnodes_whitespace_between_links(self):
+        new_nodes = text_to_textnodes("[a](b) ![c](d) **e**")
+        self.assertListEqual(
+            new_nodes,
+            [
+                TextNode("a", TextType.LINK, "b"),
+                TextNode("c", TextType.IMAGE, "d"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("e", TextType.BOLD),
+            ],
+        )
+
+    def test_text_to_textnodes_unmatched_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("**bold _italic** text_")
+        with self.assertRaises(ValueError):
+            text_to_textnodes("`code [link](url)`")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+from src.listing import collect_metadata, generate_listings, is_feed_file, scan_metadata
+from src.manifest import BuildManifest, hash_file
+
+
+class TestMetadata(unittest.TestCase):
+    def test_scan_metadata(self):
+        lines = iter(["# My **Post**\n", "\n", "Some _intro_ text\n", "more\n", "\n", "## Rest\n"])
+        self.assertEqual(
+            scan_metadata(lines), {"title": "My **Post**", "summary": "Some intro text more"}
+        )
+        self.assertEqual(next(lines), "## Rest\n")
+
+    def test_scan_metadata_missing(self):
+        self.assertEqual(scan_metadata(["- a list\n"]), {"title": None, "summary": None})
+
+    def test_collect_metadata_reuses_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "post.md")
+            with open(source, "w") as f:
+                f.write("# Post\n\nIntro\n")
+            manifest = BuildManifest()
+            manifest.record(source, hash_file(source), "post.html")
+            first = collect_metadata([(source, "post.html")], manifest)
+            self.assertEqual(manifest.pages[source]["metadata"]["title"], "Post")
+
+            manifest.pages[source]["metadata"]["title"] = "Cached"
+            second = collect_metadata([(source, "post.html")], manifest)
+            self.assertEqual(first[0]["title"], "Post")
+            self.assertEqual(second[0]["title"], "Cached")
+            self.assertEqual(second[0]["dest_path"], "post.html")
+
+            manifest.record(source, "changed", "post.html")
+            third = collect_metadata([(source, "post.html")], manifest)
+            self.assertEqual(third[0]["title"], "Post")
+
+
+class TestGenerateListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for number in range(3):
+            self.write_post(f"post{number}", f"# Post {number}\n\nAbout {number}\n", number)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_post(self, name, text, mtime):
+        path = os.path.join(self.content, "blog", name, "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, (mtime, mtime))
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts), "r") as f:
+            return f.read()
+
+    def test_pagination(self):
+        pages = generate_listings(
+            self.content, "blog", self.template, self.dest, "/site/", per_page=2
+        )
+        self.assertEqual(pages, 2)
+        first = self.read("blog", "index.html")
+        self.assertIn("<title>Blog</title>", first)
+        self.assertIn('href="/site/index.css"', first)
+        self.assertLess(first.index("Post 2"), first.index("Post 1"))
+        self.assertNotIn("Post 0", first)
+        self.assertIn('<a href="/site/blog/page/2/">Older posts</a>', first)
+        second = self.read("blog", "page", "2", "index.html")
+        self.assertIn('<a href="/site/blog/post0/">Post 0</a>', second)
+        self.assertIn('<a href="/site/blog/">Newer posts</a>', second)
+
+        os.remove(os.path.join(self.content, "blog", "post0", "index.md"))
+        self.assertEqual(
+            generate_listings(self.content, "blog", self.template, self.dest, per_page=2), 1
+        )
+        self.assertFalse(
+            os.path.exists(os.path.join(self.dest, "blog", "page", "2", "index.html"))
+        )
+
+    def test_section_with_own_index(self):
+        self.write_post("", "# Welcome\n", 10)
+        generate_listings(self.content, "blog", self.template, self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+        self.assertIn("Post 0", self.read("blog", "page", "1", "index.html"))
+        self.assertNotIn("Welcome", self.read("blog", "atom.xml"))
+
+    def test_section_with_own_index_relative_paths(self):
+        self.write_post("", "# Welcome\n", 10)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            generate_listings("./content", "blog", "./template.html", "./docs")
+        finally:
+            os.chdir(cwd)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+        self.assertNotIn("Welcome", self.read("blog", "page", "1", "index.html"))
+
+    def test_feed(self):
+        generate_listings(
+            self.content, "blog", self.template, self.dest, "/site/", site_url="https://a.dev/"
+        )
+        feed = self.read("blog", "atom.xml")
+        self.assertTrue(feed.startswith('<?xml version="1.0" encoding="utf-8"?>'))
+        self.assertIn('<link rel="self" href="https://a.dev/site/blog/atom.xml" />', feed)
+        self.assertIn("<id>https://a.dev/site/blog/post2/</id>", feed)
+        self.assertIn("<updated>1970-01-01T00:00:02+00:00</updated>", feed)
+        self.assertIn("<summary>About 1</summary>", feed)
+        self.assertTrue(is_feed_file(os.path.join("blog", "atom.xml")))
+        self.assertFalse(is_feed_file(os.path.join("blog", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
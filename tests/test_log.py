@@ -0,0 +1,43 @@
+import io
+import logging
+import unittest
+from src.log import NORMAL, QUIET, VERBOSE, configure_logging, flush_logs, logger
+
+
+class TestLogging(unittest.TestCase):
+    def tearDown(self):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    def log_at(self, level):
+        stream = io.StringIO()
+        configure_logging(level, stream)
+        child = logging.getLogger("src.copystatic")
+        child.debug("per file")
+        child.info("summary")
+        child.warning("problem")
+        flush_logs()
+        return stream.getvalue().splitlines()
+
+    def test_normal_hides_per_file_lines(self):
+        self.assertEqual(self.log_at(NORMAL), ["summary", "problem"])
+
+    def test_verbose_shows_everything(self):
+        self.assertEqual(self.log_at(VERBOSE), ["per file", "summary", "problem"])
+
+    def test_quiet_only_shows_warnings(self):
+        self.assertEqual(self.log_at(QUIET), ["problem"])
+
+    def test_records_are_buffered_until_flush(self):
+        stream = io.StringIO()
+        configure_logging(NORMAL, stream)
+        logger.info("buffered")
+        self.assertEqual(stream.getvalue(), "")
+        flush_logs()
+        self.assertEqual(stream.getvalue(), "buffered\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from src.main import parse_args
+
+
+class TestParseArgs(unittest.TestCase):
+    def assertRejected(self, argv, message):
+        stderr = StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit):
+            parse_args(argv)
+        self.assertIn(message, stderr.getvalue())
+
+    def test_watch_defaults(self):
+        args = parse_args(["--watch", "--incremental", "-v", "/site/"])
+        self.assertTrue(args.watch)
+        self.assertEqual(args.basepath, "/site/")
+
+    def test_watch_rejects_ignored_flags(self):
+        self.assertRejected(["--watch", "--minify"], "--watch cannot be combined with --minify")
+        self.assertRejected(
+            ["--watch", "--listing", "blog", "-j", "2"],
+            "--watch cannot be combined with --listing, --jobs",
+        )
+
+    def test_shard_spec_errors_are_reported(self):
+        self.assertEqual(parse_args(["--shard", "2/4"]).shard, (2, 4))
+        self.assertRejected(["--shard", "2/4/6"], "expected I/N, e.g. 2/4, got '2/4/6'")
+
+    def test_listing_requires_content_directory(self):
+        self.assertRejected(["--listing", "no-such-section"], "--listing no-such-section")
+
+
+if __name__ == "__main__":
+    unittest.main()
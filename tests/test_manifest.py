@@ -0,0 +1,218 @@
+import os
+import tempfile
+import unittest
+from src.manifest import (
+    BuildManifest,
+    hash_bytes,
+    load_json_state,
+    refresh_file_entries,
+    save_json_state,
+)
+from src.generate_content import generate_pages_incremental
+
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+
+class TestBuildManifest(unittest.TestCase):
+    def test_load_missing_manifest(self):
+        manifest = BuildManifest.load("/nonexistent/manifest.json")
+        self.assertEqual(manifest.pages, {})
+        self.assertIsNone(manifest.template_hash)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            manifest = BuildManifest()
+            manifest.begin("t", "/")
+            manifest.record("a.md", "h", "a.html")
+            manifest.save(path)
+            loaded = BuildManifest.load(path)
+            self.assertEqual(loaded.template_hash, "t")
+            self.assertEqual(loaded.pages, manifest.pages)
+
+    def test_is_current_requires_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "a.html")
+            manifest = BuildManifest()
+            manifest.begin("t", "/")
+            manifest.record("a.md", "h", dest)
+            self.assertFalse(manifest.is_current("a.md", "h", dest))
+            open(dest, "w").close()
+            self.assertTrue(manifest.is_current("a.md", "h", dest))
+            self.assertFalse(manifest.is_current("a.md", "other", dest))
+
+    def test_basepath_change_invalidates(self):
+        manifest = BuildManifest()
+        manifest.begin("t", "/")
+        manifest.record("a.md", "h", "a.html")
+        manifest.begin("t", "/blog/")
+        self.assertEqual(manifest.pages, {})
+
+    def test_finish_prunes_unseen_pages(self):
+        manifest = BuildManifest()
+        manifest.begin("t", "/")
+        manifest.record("a.md", "h", "a.html")
+        manifest.begin("t", "/")
+        manifest.finish()
+        self.assertEqual(manifest.pages, {})
+
+    def test_finish_removes_output_of_unseen_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            old, kept = os.path.join(tmp, "old.html"), os.path.join(tmp, "kept.html")
+            open(old, "w").close()
+            open(kept, "w").close()
+            manifest = BuildManifest()
+            manifest.begin("t", "/")
+            manifest.record("old.md", "h", old)
+            manifest.record("kept.md", "h", kept)
+            manifest.begin("t", "/")
+            manifest.is_current("kept.md", "h", kept)
+            manifest.finish()
+            self.assertFalse(os.path.exists(old))
+            self.assertTrue(os.path.exists(kept))
+
+    def test_finish_keeps_output_claimed_by_another_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "a.html")
+            open(dest, "w").close()
+            manifest = BuildManifest()
+            manifest.begin("t", "/")
+            manifest.record("a.md", "h", dest)
+            manifest.begin("other", "/")
+            manifest.record("a.markdown", "h", dest)
+            manifest.finish()
+            self.assertTrue(os.path.exists(dest))
+            self.assertEqual(list(manifest.pages), ["a.markdown"])
+
+    def test_hash_bytes(self):
+        self.assertEqual(hash_bytes(b"a"), hash_bytes(b"a"))
+        self.assertNotEqual(hash_bytes(b"a"), hash_bytes(b"b"))
+
+
+class TestStateHelpers(unittest.TestCase):
+    def test_json_state(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.json")
+            self.assertIsNone(load_json_state(path))
+            save_json_state(path, {"files": {"a": 1}, "list": []})
+            self.assertEqual(load_json_state(path, "files"), {"a": 1})
+            self.assertIsNone(load_json_state(path, "list"))
+            with open(path, "w") as f:
+                f.write("[1, 2")
+            self.assertIsNone(load_json_state(path))
+
+    def test_refresh_file_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "sub"))
+            for name in ("a.txt", "sub/b.txt", "c.skip"):
+                with open(os.path.join(tmp, name), "w") as f:
+                    f.write(name)
+            include = lambda rel_path: rel_path.endswith(".txt")
+            compute = lambda path: {"length": os.path.getsize(path)}
+            entries, computed = refresh_file_entries({}, tmp, include, compute)
+            self.assertEqual(sorted(entries), ["a.txt", "sub/b.txt"])
+            self.assertEqual((entries["a.txt"]["length"], computed), (5, 2))
+            entries["a.txt"]["length"] = 99
+            os.remove(os.path.join(tmp, "sub", "b.txt"))
+            entries, computed = refresh_file_entries(entries, tmp, include, compute)
+            self.assertEqual((list(entries), computed), (["a.txt"], 0))
+            self.assertEqual(entries["a.txt"]["length"], 99)
+            with open(os.path.join(tmp, "a.txt"), "w") as f:
+                f.write("changed")
+            entries, computed = refresh_file_entries(entries, tmp, include, compute)
+            self.assertEqual((entries["a.txt"]["length"], computed), (7, 1))
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.docs = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        self.manifest = os.path.join(root, "manifest.json")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nHello")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath="/"):
+        generate_pages_incremental(
+            self.content, self.template, self.docs, basepath, self.manifest
+        )
+
+    def mark_output(self):
+        with open(os.path.join(self.docs, "index.html"), "w") as f:
+            f.write("stale")
+
+    def read_output(self):
+        with open(os.path.join(self.docs, "index.html")) as f:
+            return f.read()
+
+    def test_unchanged_page_is_skipped(self):
+        self.build()
+        self.mark_output()
+        self.build()
+        self.assertEqual(self.read_output(), "stale")
+
+    def test_changed_source_is_rebuilt(self):
+        self.build()
+        self.mark_output()
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nChanged")
+        self.build()
+        self.assertIn("Changed", self.read_output())
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        self.mark_output()
+        with open(self.template, "w") as f:
+            f.write("<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertTrue(self.read_output().startswith("<h1>Home</h1>"))
+
+    def test_basepath_change_rebuilds_all(self):
+        self.build()
+        self.mark_output()
+        self.build("/site/")
+        self.assertNotEqual(self.read_output(), "stale")
+
+    def test_deleted_source_removes_output(self):
+        with open(os.path.join(self.content, "post.md"), "w") as f:
+            f.write("# Post")
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "post.html")))
+        os.remove(os.path.join(self.content, "post.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "post.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_failed_walk_keeps_outputs(self):
+        with open(os.path.join(self.content, "post.md"), "w") as f:
+            f.write("# Post")
+        self.build()
+        os.symlink(os.path.join(self.content, "missing"), os.path.join(self.content, "dangling"))
+        with self.assertRaises(FileNotFoundError):
+            self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "post.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        self.assertEqual(len(BuildManifest.load(self.manifest).pages), 2)
+
+    def test_deleted_source_removes_output_when_template_changes(self):
+        with open(os.path.join(self.content, "post.md"), "w") as f:
+            f.write("# Post")
+        self.build()
+        os.remove(os.path.join(self.content, "post.md"))
+        with open(self.template, "w") as f:
+            f.write("<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "post.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
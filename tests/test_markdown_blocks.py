@@ -1,8 +1,12 @@
 import unittest
+from src.render_options import RenderOptions
 from src.markdown_blocks import (
     markdown_to_blocks,
     block_to_block_type,
     markdown_to_html_node,
+    parse_document,
+    scan_blocks,
+    scan_title,
     BlockType,
 )
 
@@ -179,6 +183,92 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_code_with_blank_lines(self):
+        md = "Intro\n\n```\ndef f():\n\n    return 1\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md), ["Intro", "```\ndef f():\n\n    return 1\n```", "Outro"]
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>Intro</p><pre><code>def f():\n\n    return 1\n</code></pre><p>Outro</p></div>",
+        )
+
+    def test_unclosed_fence_is_split(self):
+        self.assertEqual(markdown_to_blocks("```\na\n\nb"), ["```\na", "b"])
+
+    def test_inline_code_span_does_not_open_fence(self):
+        md = "```x``` is inline\n\nSome paragraph\n\n```\ncode\n```"
+        self.assertEqual(
+            markdown_to_blocks(md), ["```x``` is inline", "Some paragraph", "```\ncode\n```"]
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p><code>x</code> is inline</p><p>Some paragraph</p>"
+            "<pre><code>code\n</code></pre></div>",
+        )
+
+    def test_fence_closes_only_on_backtick_line(self):
+        md = "```\na\n```not a close\n\nb\n  ```  \n\nc"
+        blocks = list(scan_blocks(md.split("\n")))
+        self.assertEqual(
+            [block for block, _, _ in blocks], ["```\na\n```not a close\n\nb\n  ```", "c"]
+        )
+        self.assertEqual(blocks[0][1], BlockType.CODE)
+
+    def test_scan_blocks_from_file_lines(self):
+        lines = ["# Title\n", "\n", "\n", "- a\n", "- b\n", "   \n", "\n"]
+        self.assertEqual(
+            list(scan_blocks(lines)),
+            [
+                ("# Title", BlockType.HEADING, ["# Title"]),
+                ("- a\n- b", BlockType.ULIST, ["- a", "- b"]),
+            ],
+        )
+
+    def test_scan_title_stops_at_first_h1(self):
+        lines = iter(["## Intro\n", "\n", "# Main *title*\n", "\n", "# Later\n"])
+        self.assertEqual(scan_title(lines), "Main *title*")
+        self.assertEqual(next(lines), "# Later\n")
+        self.assertIsNone(scan_title(["text"]))
+
+    def test_parse_document(self):
+        md = """
+## Intro
+
+# Main **title**
+
+Some text
+
+### Details
+"""
+        document = parse_document(md)
+        self.assertEqual(
+            document.block_types,
+            [BlockType.HEADING, BlockType.HEADING, BlockType.PARAGRAPH, BlockType.HEADING],
+        )
+        self.assertEqual(document.title, "Main **title**")
+        self.assertEqual(
+            document.outline, [(2, "Intro"), (1, "Main **title**"), (3, "Details")]
+        )
+
+    def test_basepath_applies_to_links_not_code(self):
+        md = """
+[home](/index) and `href="/x"`
+
+```
+<a href="/raw">raw</a>
+```
+"""
+        node = markdown_to_html_node(md, options=RenderOptions("/site/"))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/site/index">home</a> and <code>href="/x"</code></p>'
+            '<pre><code><a href="/raw">raw</a>\n</code></pre></div>',
+        )
+
+    def test_parse_document_without_title(self):
+        self.assertIsNone(parse_document("## Only a subheading").title)
+
 
 if __name__ == "__main__":
     unittest.main()
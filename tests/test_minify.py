@@ -0,0 +1,72 @@
+import unittest
+from src.minify import MinifyCache, minify_css, minify_html
+
+
+class TestMinifyHTML(unittest.TestCase):
+    def test_collapse_whitespace(self):
+        self.assertEqual(
+            minify_html("<ul>\n  <li>a  <b>big</b>\n   deal</li>\n</ul>\n"),
+            "<ul><li>a <b>big</b> deal</li></ul>",
+        )
+
+    def test_comments(self):
+        self.assertEqual(
+            minify_html("<p>a <!-- x --> b</p><!--[if IE]>old<![endif]-->"),
+            "<p>a b</p><!--[if IE]>old<![endif]-->",
+        )
+        self.assertEqual(minify_html("<p>a<!-- x -->b <!-- y --></p>"), "<p>ab</p>")
+
+    def test_raw_elements_kept(self):
+        html = "<div>\n<pre>  a\n   b</pre>\n<script>\nif (a < b) {}\n</script>\n</div>"
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre>  a\n   b</pre><script>\nif (a < b) {}\n</script></div>",
+        )
+
+    def test_edges_only_collapsed(self):
+        self.assertEqual(minify_html("</b>\n  "), "</b> ")
+        self.assertEqual(minify_html("\n  <title>"), "<title>")
+
+
+class TestMinifyCSS(unittest.TestCase):
+    def test_whitespace_and_comments(self):
+        css = "/* theme */\nh1 , h2 > a {\n  color : red ;\n  margin: 0 auto;\n}\n"
+        self.assertEqual(minify_css(css), "h1,h2>a{color:red;margin:0 auto}")
+
+    def test_strings_and_license_kept(self):
+        css = '/*! MIT */ a::after { content: "a ,  b /* c */"; }'
+        self.assertEqual(minify_css(css), '/*! MIT */ a::after{content:"a ,  b /* c */"}')
+
+    def test_selector_colon_kept(self):
+        self.assertEqual(
+            minify_css("a :hover { --x : 1 }\n@media print { b :first-child { top : 0 } }"),
+            "a :hover{--x:1}@media print{b :first-child{top:0}}",
+        )
+        self.assertEqual(
+            minify_css('a { font-family : "A" , serif ; content :"x" }'),
+            'a{font-family:"A",serif;content:"x"}',
+        )
+
+    def test_media_query(self):
+        self.assertEqual(
+            minify_css("@media (max-width: 600px) {\n  a { color: red; }\n}"),
+            "@media (max-width:600px){a{color:red}}",
+        )
+
+
+class TestMinifyCache(unittest.TestCase):
+    def test_minify_once_per_content(self):
+        cache = MinifyCache()
+        self.assertEqual(cache.minify(b"a {  }"), b"a{}")
+        self.assertEqual(cache.minify(b"a {  }"), b"a{}")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_prune_keeps_used_entries(self):
+        cache = MinifyCache({"old": "b{}"})
+        cache.minify(b"a {}")
+        self.assertEqual(list(cache.entries), ["old", list(cache.used)[0]])
+        self.assertNotIn("old", cache.used)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from src.pipeline import run_pipeline
+
+
+def square(n):
+    if n == 3:
+        raise ValueError("three")
+    return n * n
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_writes_results_in_order(self):
+        written = []
+        failures = run_pipeline(
+            list(range(10)),
+            lambda item: item + 1,
+            square,
+            lambda item, result: written.append((item, result)),
+            jobs=2,
+            queue_size=2,
+        )
+        self.assertEqual(len(failures), 1)
+        item, error = failures[0]
+        self.assertEqual(item, 2)
+        self.assertIsInstance(error, ValueError)
+        self.assertEqual(
+            written, [(i, (i + 1) ** 2) for i in range(10) if i != 2]
+        )
+
+    def test_collects_read_and_write_failures(self):
+        def read(item):
+            if item == "missing":
+                raise FileNotFoundError(item)
+            return 2
+
+        def write(item, result):
+            if item == "readonly":
+                raise PermissionError(item)
+
+        failures = run_pipeline(["missing", "ok", "readonly"], read, square, write, jobs=1)
+        self.assertEqual(
+            [(item, type(error)) for item, error in failures],
+            [("missing", FileNotFoundError), ("readonly", PermissionError)],
+        )
+
+    def test_empty(self):
+        self.assertEqual(run_pipeline([], str, square, print, jobs=1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
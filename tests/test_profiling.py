@@ -0,0 +1,66 @@
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from src.generate_content import generate_page
+from src.profiling import (
+    BuildProfiler,
+    disable_profiling,
+    enable_profiling,
+    get_profiler,
+    profile_stage,
+)
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def tearDown(self):
+        disable_profiling()
+
+    def test_nested_stage_time_is_exclusive(self):
+        profiler = BuildProfiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(profiler.stages["inner"], 0.02)
+        self.assertLess(profiler.stages["outer"], 0.01)
+
+    def test_merge(self):
+        profiler = BuildProfiler()
+        profiler.stages["read"] = 1.0
+        profiler.merge({"stages": {"read": 0.5, "write": 2.0}, "pages": {"a.md": 0.1}})
+        self.assertEqual(profiler.stages, {"read": 1.5, "write": 2.0})
+        self.assertEqual(profiler.pages, {"a.md": 0.1})
+
+    def test_slowest_pages(self):
+        profiler = BuildProfiler()
+        for i in range(5):
+            profiler.add_page(f"{i}.md", i)
+        summary = profiler.to_dict(slowest=2)
+        self.assertEqual([page["path"] for page in summary["slowest_pages"]], ["4.md", "3.md"])
+        self.assertEqual(summary["pages"], 5)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_profiler())
+        with profile_stage("read"):
+            pass
+
+    def test_page_build_is_profiled(self):
+        profiler = enable_profiling()
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "index.md")
+            template = os.path.join(tmp, "template.html")
+            with open(source, "w") as f:
+                f.write("# Title\n\nSome **bold** text")
+            with open(template, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            with redirect_stdout(StringIO()):
+                generate_page(source, template, os.path.join(tmp, "out", "index.html"))
+        self.assertEqual(list(profiler.pages), [source])
+        for stage in ("read", "blocks", "tree", "inline", "render", "template", "write"):
+            self.assertIn(stage, profiler.stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+from src.generate_content import find_pages, generate_pages_recursive
+from src.markdown_blocks import BlockType
+from src.search_index import (
+    block_terms,
+    build_search_index,
+    disable_indexing,
+    enable_indexing,
+    encode_index,
+    load_search_index,
+    page_url,
+    tokenize,
+    write_search_index,
+)
+
+
+class TestTerms(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Tolkien's 3 Rings_of POWER!"), ["tolkien", "rings", "of", "power"]
+        )
+
+    def test_block_terms_skip_urls(self):
+        terms = block_terms(
+            "- see [the docs](https://boot.dev/docs)\n- ![Tom **art**](/images/tom.png)",
+            BlockType.ULIST,
+        )
+        self.assertEqual(terms, {"see": 1, "the": 1, "docs": 1, "tom": 1, "art": 1})
+
+    def test_block_terms_code(self):
+        self.assertEqual(
+            block_terms("```\nreturn value\n```", BlockType.CODE), {"return": 1, "value": 1}
+        )
+
+
+class TestIndexEncoding(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pages = {
+            "/b/": {"title": "B", "hash": "2", "terms": {"apple": 2, "zebra": 1}},
+            "/a/": {"title": "A", "hash": "1", "terms": {"apple": 1, "9lives": 3}},
+            "/c/": {"title": "C", "hash": "3", "terms": {"apple": 4, "élan": 1}},
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_encode_delta_postings(self):
+        table, shards = encode_index(self.pages)
+        self.assertEqual([page[0] for page in table["pages"]], ["/a/", "/b/", "/c/"])
+        self.assertEqual(table["shards"], ["9", "_", "a", "z"])
+        self.assertEqual(shards["a"], {"terms": ["apple"], "postings": [[0, 1, 1, 2, 1, 4]]})
+        self.assertEqual(shards["z"], {"terms": ["zebra"], "postings": [[1, 1]]})
+
+    def test_round_trip_and_stale_shards(self):
+        write_search_index(self.tmp.name, self.pages)
+        self.assertEqual(load_search_index(self.tmp.name), self.pages)
+        del self.pages["/b/"]
+        write_search_index(self.tmp.name, self.pages)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "z.json")))
+        self.assertEqual(write_search_index(self.tmp.name, self.pages), 0)
+
+    def test_page_url(self):
+        self.assertEqual(page_url("docs/index.html", "docs", "/site/"), "/site/")
+        self.assertEqual(page_url("docs/blog/tom/index.html", "docs"), "/blog/tom/")
+        self.assertEqual(page_url("docs/about.html", "docs"), "/about.html")
+
+
+class TestBuildSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.docs = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write("index.md", "# Home\n\nWelcome home")
+        self.write("blog/post.md", "# Post\n\nA **bold** post")
+        with open(self.template, "w") as f:
+            f.write("{{ Title }}{{ Content }}")
+
+    def tearDown(self):
+        disable_indexing()
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.content, rel_path), "w") as f:
+            f.write(text)
+
+    def build(self, jobs=1):
+        indexer = enable_indexing()
+        generate_pages_recursive(self.content, self.template, self.docs, jobs=jobs)
+        return build_search_index(find_pages(self.content, self.docs), self.docs, "/", indexer)
+
+    def test_parallel_build_collects_worker_terms(self):
+        self.assertEqual(self.build(jobs=2), (2, 0))
+        pages = load_search_index(os.path.join(self.docs, "search"))
+        self.assertEqual(pages["/blog/post.html"]["terms"], {"post": 2, "bold": 1})
+        self.assertEqual(pages["/"]["title"], "Home")
+
+    def test_unchanged_pages_are_merged(self):
+        self.build()
+        self.write("index.md", "# Home\n\nWelcome back")
+        pages = find_pages(self.content, self.docs)
+        self.assertEqual(build_search_index(pages, self.docs, "/", enable_indexing()), (2, 1))
+        pages = load_search_index(os.path.join(self.docs, "search"))
+        self.assertIn("back", pages["/"]["terms"])
+        with open(os.path.join(self.docs, "search", "pages.json")) as f:
+            self.assertEqual(len(json.load(f)["pages"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import argparse
+import os
+import tempfile
+import unittest
+from src.generate_content import generate_pages_incremental
+from src.manifest import BuildManifest
+from src.shards import (
+    SHARD_MANIFEST,
+    SHARD_OUTPUT,
+    find_shard_dirs,
+    merge_shards,
+    page_shard,
+    parse_shard,
+    save_shard_info,
+    select_shard,
+)
+
+
+class TestPartition(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text, message in (
+            ("0/4", "between 1 and 4, got 0"),
+            ("5/4", "between 1 and 4, got 5"),
+            ("1/0", "at least 1"),
+            ("2", "expected I/N"),
+            ("2/4/6", "expected I/N"),
+            ("a/b", "must be integers"),
+        ):
+            with self.assertRaisesRegex(argparse.ArgumentTypeError, message):
+                parse_shard(text)
+
+    def test_page_shard_is_relative_and_stable(self):
+        self.assertEqual(
+            page_shard("./content/blog/tom/index.md", "./content", 8),
+            page_shard("/checkout/content/blog/tom/index.md", "/checkout/content", 8),
+        )
+        self.assertEqual(page_shard("content/index.md", "content", 1), 1)
+
+    def test_select_shard_partitions_pages(self):
+        pages = [(f"content/page{number}.md", f"docs/page{number}.html") for number in range(50)]
+        shards = [select_shard(pages, "content", (index, 3)) for index in (1, 2, 3)]
+        self.assertTrue(all(shards))
+        self.assertEqual(sorted(sum(shards, [])), sorted(pages))
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.shards = os.path.join(self.tmp.name, "shards")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for number in range(6):
+            path = os.path.join(self.content, f"page{number}", "index.md")
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write(f"# Page {number}\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_shard(self, index, count, basepath="/"):
+        shard_dir = os.path.join(self.shards, str(index))
+        save_shard_info(shard_dir, (index, count), basepath)
+        return generate_pages_incremental(
+            self.content,
+            self.template,
+            os.path.join(shard_dir, SHARD_OUTPUT),
+            basepath,
+            manifest_path=os.path.join(shard_dir, SHARD_MANIFEST),
+            shard=(index, count),
+        )
+
+    def test_merge(self):
+        built = [self.build_shard(index, 2) for index in (1, 2)]
+        self.assertEqual(sum(built), 6)
+        self.assertEqual(len(find_shard_dirs(self.shards)), 2)
+
+        merged = merge_shards(find_shard_dirs(self.shards), self.docs, self.manifest_path)
+        self.assertEqual(merged, 6)
+        with open(os.path.join(self.docs, "page3", "index.html")) as f:
+            self.assertEqual(f.read(), "<title>Page 3</title><div><h1>Page 3</h1></div>")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(len(manifest.pages), 6)
+        self.assertTrue(
+            all(
+                entry["output_path"].startswith(self.docs)
+                for entry in manifest.pages.values()
+            )
+        )
+        self.assertEqual(
+            generate_pages_incremental(
+                self.content, self.template, self.docs, manifest_path=self.manifest_path
+            ),
+            0,
+        )
+
+    def test_missing_shard(self):
+        self.build_shard(1, 2)
+        with self.assertRaises(ValueError):
+            merge_shards(find_shard_dirs(self.shards), self.docs, self.manifest_path)
+
+    def test_basepath_mismatch(self):
+        self.build_shard(1, 2, "/site/")
+        self.build_shard(2, 2, "/site/")
+        with self.assertRaisesRegex(ValueError, "basepath '/site/'"):
+            merge_shards(find_shard_dirs(self.shards), self.docs, self.manifest_path)
+        merged = merge_shards(
+            find_shard_dirs(self.shards), self.docs, self.manifest_path, basepath="/site/"
+        )
+        self.assertEqual(merged, 6)
+
+    def test_options_mismatch(self):
+        self.build_shard(1, 2)
+        self.build_shard(2, 2)
+        with self.assertRaisesRegex(ValueError, "different"):
+            merge_shards(
+                find_shard_dirs(self.shards),
+                self.docs,
+                self.manifest_path,
+                options_key="/\0minify",
+            )
+
+    def test_page_built_twice(self):
+        self.build_shard(1, 2)
+        self.build_shard(2, 2)
+        manifest = BuildManifest.load(os.path.join(self.shards, "1", SHARD_MANIFEST))
+        manifest.save(os.path.join(self.shards, "2", SHARD_MANIFEST))
+        with self.assertRaises(ValueError):
+            merge_shards(find_shard_dirs(self.shards), self.docs, self.manifest_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
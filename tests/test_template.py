@@ -0,0 +1,72 @@
+import io
+import unittest
+from src.htmlnode import LeafNode, ParentNode
+from src.render_options import RenderOptions
+from src.template import Template, rebase_urls
+
+
+class TestTemplate(unittest.TestCase):
+    def test_split_into_segments_and_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.segments, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render("Hi", "<p>text</p>"),
+            "<title>Hi</title><main><p>text</p></main>",
+        )
+
+    def test_render_repeated_slot(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render("a", ""), "a|a")
+
+    def test_unknown_placeholder_is_literal(self):
+        template = Template("{{ Other }}{{ Title }}")
+        self.assertEqual(template.render("a", ""), "{{ Other }}a")
+
+    def test_basepath_rebases_template_only(self):
+        template = Template('<link href="/index.css" />{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render("t", '<code>src="/a.png"</code>'),
+            '<link href="/site/index.css" /><code>src="/a.png"</code>',
+        )
+
+    def test_rebase_urls_default_basepath(self):
+        html = '<a href="/x">x</a>'
+        self.assertEqual(rebase_urls(html, "/"), html)
+
+    def test_options_fingerprint_template_urls(self):
+        options = RenderOptions("/site/", {"/index.css": "/index.abc.css"})
+        template = Template(
+            '<link href="/index.css" /><a href="/blog">b</a>{{ Content }}', "/site/", options
+        )
+        self.assertEqual(
+            template.render("t", ""),
+            '<link href="/site/index.abc.css" /><a href="/site/blog">b</a>',
+        )
+
+    def test_options_minify_template(self):
+        options = RenderOptions("/", minify=True)
+        template = Template(
+            "<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n"
+            "  <!-- page -->\n  <body>\n    <span>a</span>\n    <b>{{ Content }}</b>\n"
+            "  </body>\n</html>\n",
+            "/",
+            options,
+        )
+        self.assertEqual(
+            template.render("t", "c"),
+            "<html><head><title>t</title></head><body><span>a</span> <b>c</b></body></html>",
+        )
+
+    def test_write_streams_content(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        buffer = io.StringIO()
+        template.write(buffer, "Hi", ParentNode("p", [LeafNode("b", "text")]))
+        self.assertEqual(buffer.getvalue(), "<title>Hi</title><main><p><b>text</b></p></main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 
+from src.render_options import RenderOptions
 from src.textnode import TextNode, TextType, text_node_to_html_node
 
 
@@ -65,6 +66,43 @@ class TestTextNodetoHTMLNode(unittest.TestCase):
             {"src": "boot.dev", "alt": "This is an image node"},
         )
 
+    def test_link_rebased(self):
+        node = TextNode("home", TextType.LINK, "/blog/post")
+        html_node = text_node_to_html_node(node, RenderOptions("/site/"))
+        self.assertEqual(html_node.props, {"href": "/site/blog/post"})
+
+    def test_image_rebased(self):
+        node = TextNode("alt", TextType.IMAGE, "/images/a.png")
+        html_node = text_node_to_html_node(node, RenderOptions("/site/"))
+        self.assertEqual(html_node.props, {"src": "/site/images/a.png", "alt": "alt"})
+
+    def test_external_link_not_rebased(self):
+        node = TextNode("boot", TextType.LINK, "https://boot.dev")
+        html_node = text_node_to_html_node(node, RenderOptions("/site/"))
+        self.assertEqual(html_node.props, {"href": "https://boot.dev"})
+
+    def test_image_fingerprinted(self):
+        node = TextNode("alt", TextType.IMAGE, "/images/a.png")
+        options = RenderOptions("/site/", {"/images/a.png": "/images/a.0123.png"})
+        html_node = text_node_to_html_node(node, options)
+        self.assertEqual(html_node.props, {"src": "/site/images/a.0123.png", "alt": "alt"})
+        self.assertNotEqual(options.cache_key(), RenderOptions("/site/").cache_key())
+
+    def test_image_dimensions_and_lazy_loading(self):
+        options = RenderOptions("/site/", image_sizes={"/images/a.png": (640, 480)})
+        sized = text_node_to_html_node(TextNode("a", TextType.IMAGE, "/images/a.png"), options)
+        self.assertEqual(
+            sized.to_html(),
+            '<img src="/site/images/a.png" alt="a" width="640" height="480"'
+            ' loading="lazy" decoding="async"></img>',
+        )
+        unknown = text_node_to_html_node(TextNode("b", TextType.IMAGE, "https://x/b.png"), options)
+        self.assertEqual(
+            unknown.props,
+            {"src": "https://x/b.png", "alt": "b", "loading": "lazy", "decoding": "async"},
+        )
+        self.assertNotEqual(options.cache_key(), RenderOptions("/site/").cache_key())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from src.main import keep_outputs
+from src.watch import SiteWatcher, snapshot_files
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.docs = os.path.join(root, "docs")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(self.static)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nHello")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nText")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.watcher = SiteWatcher(
+            self.content,
+            self.static,
+            self.template,
+            self.docs,
+            manifest_path=os.path.join(root, "manifest.json"),
+        )
+        self.run_quietly(self.watcher.build)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def read(self, rel_path):
+        with open(os.path.join(self.docs, rel_path)) as f:
+            return f.read()
+
+    def run_quietly(self, function):
+        with redirect_stdout(StringIO()):
+            return function()
+
+    def test_no_changes(self):
+        self.assertFalse(self.run_quietly(self.watcher.poll))
+
+    def test_changed_page_is_rebuilt_alone(self):
+        self.write(os.path.join(self.docs, "post", "index.html"), "untouched")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited", 1)
+        self.assertTrue(self.run_quietly(self.watcher.poll))
+        self.assertIn("Edited", self.read("index.html"))
+        self.assertEqual(self.read(os.path.join("post", "index.html")), "untouched")
+
+    def test_removed_page_output_is_deleted(self):
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.run_quietly(self.watcher.poll)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "post", "index.html")))
+
+    def test_template_change_rerenders_everything(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", 1)
+        self.run_quietly(self.watcher.poll)
+        self.assertTrue(self.read("index.html").startswith("<h1>Home</h1>"))
+        self.assertTrue(self.read(os.path.join("post", "index.html")).startswith("<h1>Post</h1>"))
+
+    def test_static_change_is_synced(self):
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }", 1)
+        self.run_quietly(self.watcher.poll)
+        self.assertEqual(self.read("index.css"), "body { margin: 0 }")
+
+    def test_keep_predicate_protects_outputs(self):
+        self.watcher.keep = keep_outputs()
+        self.write(os.path.join(self.docs, "search", "pages.json"), "[]")
+        self.write(os.path.join(self.docs, "blog", "atom.xml"), "<feed/>")
+        self.write(os.path.join(self.docs, "stale.css"), "")
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }", 1)
+        self.run_quietly(self.watcher.poll)
+        self.assertEqual(self.read(os.path.join("search", "pages.json")), "[]")
+        self.assertEqual(self.read(os.path.join("blog", "atom.xml")), "<feed/>")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "stale.css")))
+
+    def test_snapshot_single_file(self):
+        self.assertEqual(list(snapshot_files(self.template)), [self.template])
+
+
+if __name__ == "__main__":
+    unittest.main()